@@ -7,8 +7,10 @@ from django.http import HttpRequest
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 
+from .cache import DjangoAvailabilityCache
 from .constants import Months
-from .models import Day, Slot
+from .models import AvailabilityJob, Day, Slot
+from .repository import DjangoAvailabilityRepository
 
 
 class SlotInlineAdmin(admin.StackedInline):
@@ -59,7 +61,7 @@ class YearFilter(SimpleListFilter):
 
 
 class DayAdmin(admin.ModelAdmin):
-    list_filter = ("definition__boat", MonthFilter, YearFilter)
+    list_filter = ("boat", MonthFilter, YearFilter)
     list_display = ("get_boat_link", "get_date_link", "get_slots")
     inlines = (SlotInlineAdmin,)
 
@@ -96,7 +98,15 @@ class DayAdmin(admin.ModelAdmin):
     get_slots.short_description = "Available slots"
 
     def get_readonly_fields(self, request: HttpRequest, obj: Day = None) -> List[str]:
-        return ["definition", "date"]
+        return ["boat", "definition", "date"]
+
+    def save_related(self, request: HttpRequest, form, formsets, change: bool):
+        super().save_related(request, form, formsets, change)
+        DjangoAvailabilityRepository.refresh_days_occupancy(day_ids=[form.instance.id])
+
+    def delete_model(self, request: HttpRequest, obj: Day):
+        super().delete_model(request, obj)
+        DjangoAvailabilityCache.invalidate_dates([obj.date])
 
     def get_boat_link(self, obj: Day) -> str:
         url = reverse(f"admin:boats_boat_change", args=[obj.boat.id])
@@ -115,3 +125,39 @@ class DayAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Day, DayAdmin)
+
+
+class AvailabilityJobAdmin(admin.ModelAdmin):
+    list_filter = ("status", "action")
+    list_display = (
+        "id",
+        "action",
+        "year",
+        "status",
+        "get_progress",
+        "created",
+        "finished_at",
+    )
+    readonly_fields = (
+        "action",
+        "boats",
+        "year",
+        "force",
+        "status",
+        "n_boats",
+        "n_processed_boats",
+        "messages",
+        "started_at",
+        "finished_at",
+    )
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def get_progress(self, obj: AvailabilityJob) -> str:
+        return f"{obj.n_processed_boats}/{obj.n_boats}"
+
+    get_progress.short_description = "Progress"
+
+
+admin.site.register(AvailabilityJob, AvailabilityJobAdmin)
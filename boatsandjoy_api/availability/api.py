@@ -1,23 +1,20 @@
-from copy import deepcopy
 from datetime import date
-from decimal import Decimal
-from typing import List, Type
+from typing import Dict, List, Tuple, Type
 
-from boatsandjoy_api.availability.exceptions import (
-    NoAvailabilityForDay,
-    NoDayDefinitionDefined,
-)
-from boatsandjoy_api.boats.api import api as boats_api
+from boatsandjoy_api.availability.exceptions import NoAvailabilityForDay
+from boatsandjoy_api.boats.api import active_boats_registry
 from boatsandjoy_api.boats.domain import Boat
 from boatsandjoy_api.boats.exceptions import NoActiveBoat
-from boatsandjoy_api.boats.requests import FilterBoatsRequest
-from boatsandjoy_api.core.exceptions import BoatsAndJoyException
+from boatsandjoy_api.core.exceptions import BoatsAndJoyException, InvalidDataError
 from boatsandjoy_api.core.responses import (
+    ErrorResponseBuilder,
     ResponseBuilder,
     ResponseBuilderInterface,
 )
-from . import domain
-from .constants import DayAvailabilityTypes
+from . import domain, pricing
+from .cache import AvailabilityCache, DjangoAvailabilityCache
+from .combinations import iter_mask_combinations, positions_to_mask
+from .constants import AvailabilityResponseFormats, DayAvailabilityTypes
 from .exceptions import (
     AvailabilityApiException,
     CombinationOfSize0,
@@ -25,11 +22,16 @@ from .exceptions import (
     NoSlotsAvailable,
 )
 from .repository import AvailabilityRepository, DjangoAvailabilityRepository
-from .requests import GetDayAvailabilityRequest, GetMonthAvailabilityRequest
-from .utils import month_date_iter
+from .requests import (
+    GetDayAvailabilityRequest,
+    GetMonthAvailabilityRequest,
+    GetRangeAvailabilityRequest,
+)
+from .utils import get_minutes, month_date_iter, range_date_iter
 from .validators import (
     GetAvailabilityRequestValidator,
     GetMonthAvailabilityRequestValidator,
+    GetRangeAvailabilityRequestValidator,
 )
 
 
@@ -38,12 +40,20 @@ class AvailabilityApi:
         self,
         availability_repository: Type[AvailabilityRepository],
         response_builder: Type[ResponseBuilderInterface],
+        error_builder: Type[ResponseBuilderInterface],
+        availability_cache: Type[AvailabilityCache],
     ):
         self.availability_repository = availability_repository
         self.response_builder = response_builder
+        self.error_builder = error_builder
+        self.availability_cache = availability_cache
 
-    def get_day_availability(self, request: GetDayAvailabilityRequest) -> dict:
+    def get_day_availability(
+        self, request: GetDayAvailabilityRequest, stamp: str = None
+    ) -> dict:
         """
+        :param stamp: as returned by get_day_availability_stamp, when the caller
+        already has it
         :return: {
             'error': bool,
             'data': [
@@ -62,23 +72,70 @@ class AvailabilityApi:
                 ...
             ]
         }
+
+        or, with the compact response format: {
+            'error': bool,
+            'data': [
+                {
+                    'boat': boat,
+                    'day': date,
+                    'slots': [
+                        {
+                            'id': int,
+                            'position': int,
+                            'from_minutes': int,
+                            'to_minutes': int
+                        },
+                        ...
+                    ],
+                    'availability': [[start_position, length, price], ...]
+                },
+                ...
+            ]
+        }
         """
         try:
             GetAvailabilityRequestValidator.validate(request)
-            results = boats_api.filter(FilterBoatsRequest(active=True))
-            boats = [Boat(**boat_data) for boat_data in results["data"]]
-            availablity_results = self._get_day_availability(
-                boats=boats,
+            return self.availability_cache.get_or_build_day_availability(
                 date_=request.date,
                 apply_resident_discount=request.apply_resident_discount,
+                response_format=request.response_format,
+                build=lambda: self._build_day_availability(request),
+                stamp=stamp,
             )
-            return self.response_builder(availablity_results).build()
 
         except AvailabilityApiException:
             return self.response_builder([]).build()
 
-    def get_month_availability(self, request: GetMonthAvailabilityRequest) -> dict:
+        except InvalidDataError as e:
+            return self.error_builder(e).build()
+
+    def get_day_availability_stamp(self, request: GetDayAvailabilityRequest) -> str:
+        """
+        :return: value that changes whenever the day availability response does
+        """
+        return self.availability_cache.get_day_availability_stamp(
+            date_=request.date,
+            apply_resident_discount=request.apply_resident_discount,
+            response_format=request.response_format,
+        )
+
+    def _build_day_availability(self, request: GetDayAvailabilityRequest) -> dict:
+        boats = active_boats_registry.get_active_boats()
+        availablity_results = self._get_day_availability(
+            boats=boats,
+            date_=request.date,
+            apply_resident_discount=request.apply_resident_discount,
+            response_format=request.response_format,
+        )
+        return self.response_builder(availablity_results).build()
+
+    def get_month_availability(
+        self, request: GetMonthAvailabilityRequest, stamp: str = None
+    ) -> dict:
         """
+        :param stamp: as returned by get_month_availability_stamp, when the
+        caller already has it
         :return: {
             'error': bool,
             'data': [
@@ -93,28 +150,92 @@ class AvailabilityApi:
         """
         try:
             GetMonthAvailabilityRequestValidator.validate(request)
-            results = boats_api.filter(FilterBoatsRequest(active=True))
-            boats = [Boat(**boat_data) for boat_data in results["data"]]
-            month_availability_results = self._get_month_availability(
-                boats=boats, month=request.month, year=request.year
+            return self.availability_cache.get_or_build_month_availability(
+                year=request.year,
+                month=request.month,
+                build=lambda: self._build_month_availability(request),
+                stamp=stamp,
             )
-            return self.response_builder(month_availability_results).build()
 
         except AvailabilityApiException:
             return self.response_builder(
                 self._generate_no_availability_month(request)
             ).build()
 
+        except InvalidDataError as e:
+            return self.error_builder(e).build()
+
+    def get_month_availability_stamp(self, request: GetMonthAvailabilityRequest) -> str:
+        """
+        :return: value that changes whenever the month availability response does
+        """
+        return self.availability_cache.get_month_availability_stamp(
+            year=request.year, month=request.month
+        )
+
+    def get_range_availability(self, request: GetRangeAvailabilityRequest) -> dict:
+        """
+        :return: {
+            'error': bool,
+            'data': [
+                {
+                    'name': 'DayAvailabilityTypes',
+                    'date': 'YYYY-MM-DD',
+                    'availability': bool
+                },
+                ...
+            ]
+        }
+        """
+        try:
+            GetRangeAvailabilityRequestValidator.validate(request)
+            boats = active_boats_registry.get_active_boats()
+            range_availability_results = self._get_range_availability(
+                boats=boats, from_date=request.from_date, to_date=request.to_date
+            )
+            return self.response_builder(range_availability_results).build()
+
+        except AvailabilityApiException:
+            return self.response_builder(
+                self._generate_no_availability_range(request)
+            ).build()
+
+        except InvalidDataError as e:
+            return self.error_builder(e).build()
+
+    def _build_month_availability(self, request: GetMonthAvailabilityRequest) -> dict:
+        boats = active_boats_registry.get_active_boats()
+        month_availability_results = self._get_month_availability(
+            boats=boats, month=request.month, year=request.year
+        )
+        return self.response_builder(month_availability_results).build()
+
     def _get_day_availability(
-        self, boats: List[Boat], date_: date, apply_resident_discount: bool
+        self,
+        boats: List[Boat],
+        date_: date,
+        apply_resident_discount: bool,
+        response_format: str = AvailabilityResponseFormats.VERBOSE,
     ) -> list:
+        get_boat_response = self._get_boat_response
+        if response_format == AvailabilityResponseFormats.COMPACT:
+            get_boat_response = self._get_compact_boat_response
+        boats_days = self.availability_repository.filter_boats_days(
+            boat_ids=[boat.id for boat in boats if boat.active], date_=date_
+        )
         results = []
         for boat in boats:
             try:
                 if not boat.active:
                     raise NoActiveBoat("This boat is not active")
+                if boat.id not in boats_days:
+                    raise NoAvailabilityForDay(
+                        f"There is not availability for boat {boat.id} on {date_}"
+                    )
                 results.append(
-                    self._get_boat_response(boat, date_, apply_resident_discount)
+                    get_boat_response(
+                        boat, boats_days[boat.id], apply_resident_discount
+                    )
                 )
             except BoatsAndJoyException:
                 continue
@@ -126,11 +247,38 @@ class AvailabilityApi:
             DayAvailabilityTypes.NO_AVAIL,
             DayAvailabilityTypes.FULL,
         )
-        for idate in month_date_iter(year, month):
+        month_dates = month_date_iter(year, month)
+        days_availability_types = self._get_days_availability_types(
+            boats, from_=max(month_dates[0], date.today()), to=month_dates[-1]
+        )
+        for idate in month_dates:
+            global_day_availability_type = self._get_global_day_availability_type(
+                boats, idate, days_availability_types
+            )
+            result = {
+                "date": idate,
+                "availability": (global_day_availability_type not in disabled_states),
+            }
+            results.append(result)
+        return results
+
+    def _get_range_availability(
+        self, boats: List[Boat], from_date: date, to_date: date
+    ) -> list:
+        results = []
+        disabled_states = (
+            DayAvailabilityTypes.NO_AVAIL,
+            DayAvailabilityTypes.FULL,
+        )
+        days_availability_types = self._get_days_availability_types(
+            boats, from_=max(from_date, date.today()), to=to_date
+        )
+        for idate in range_date_iter(from_date, to_date):
             global_day_availability_type = self._get_global_day_availability_type(
-                boats, idate
+                boats, idate, days_availability_types
             )
             result = {
+                "name": global_day_availability_type,
                 "date": idate,
                 "availability": (global_day_availability_type not in disabled_states),
             }
@@ -138,15 +286,15 @@ class AvailabilityApi:
         return results
 
     def _get_boat_response(
-        self, boat: Boat, date_: date, apply_resident_discount: bool
+        self, boat: Boat, boat_day: domain.BoatDay, apply_resident_discount: bool
     ) -> dict:
-        day_definition = DjangoAvailabilityRepository.get_day_definition(
-            boat_id=boat.id, date_=date_
-        )
-        day = DjangoAvailabilityRepository.get_day(boat, date_)
-        available_slots = DjangoAvailabilityRepository.get_available_slots(day)
+        day = boat_day.day
+        day_definition = boat_day.day_definition
+        available_slots = self.availability_repository.get_available_slots(day)
         combinations = self._get_combinations(available_slots)
-        combinations_prices = self._get_combinations_prices(boat, day, combinations)
+        price_table = pricing.get_price_table(
+            day_definition, boat_day.price_variations, max_length=len(day.slots)
+        )
         combinations_timings = self._get_combinations_timing(
             day_definition=day_definition, combinations=combinations
         )
@@ -157,7 +305,7 @@ class AvailabilityApi:
             },
             "availability": [
                 {
-                    "day": date_,
+                    "day": day.date,
                     "slots": [
                         {
                             "id": slot.id,
@@ -167,11 +315,8 @@ class AvailabilityApi:
                         }
                         for slot in combination
                     ],
-                    "price": self._apply_discounts(
-                        combination,
-                        combinations_prices[i],
-                        day_definition,
-                        apply_resident_discount,
+                    "price": price_table.get_price(
+                        len(combination), apply_resident_discount
                     ),
                     "from_hour": combinations_timings[i].from_hour,
                     "to_hour": combinations_timings[i].to_hour,
@@ -183,6 +328,47 @@ class AvailabilityApi:
             },
         }
 
+    def _get_compact_boat_response(
+        self, boat: Boat, boat_day: domain.BoatDay, apply_resident_discount: bool
+    ) -> dict:
+        """
+        Available slots are sent once, with their hours as minutes since
+        midnight, and combinations as spans of their positions
+        """
+        day = boat_day.day
+        available_slots = self.availability_repository.get_available_slots(day)
+        self._check_slots(available_slots)
+        available_slots = DjangoAvailabilityRepository.sort_slots(slots=available_slots)
+        price_table = pricing.get_price_table(
+            boat_day.day_definition,
+            boat_day.price_variations,
+            max_length=len(day.slots),
+        )
+        positions_mask = positions_to_mask(slot.position for slot in available_slots)
+        return {
+            "boat": {
+                "id": boat.id,
+                "name": boat.name,
+            },
+            "day": day.date,
+            "slots": [
+                {
+                    "id": slot.id,
+                    "position": slot.position,
+                    "from_minutes": get_minutes(slot.from_hour),
+                    "to_minutes": get_minutes(slot.to_hour),
+                }
+                for slot in available_slots
+            ],
+            "availability": [
+                [start, length, price_table.get_price(length, apply_resident_discount)]
+                for start, length in iter_mask_combinations(positions_mask)
+            ],
+            "discounts": {
+                "resident": boat_day.day_definition.resident_discount,
+            },
+        }
+
     def _get_combinations(self, slots: List[domain.Slot]) -> List[List[domain.Slot]]:
         """
         Two slots can be at the same combination just
@@ -190,21 +376,11 @@ class AvailabilityApi:
         """
         self._check_slots(slots)
         slots = DjangoAvailabilityRepository.sort_slots(slots=slots)
+        indexes = {slot.position: i for i, slot in enumerate(slots)}
         combinations = []
-        for slot1 in slots:
-            combination = [slot1]
-            combinations = self._add_combination(combinations, combination)
-            aux_slot = deepcopy(slot1)
-            for slot2 in slots:
-                if aux_slot.position == slot2.position:
-                    continue
-                if aux_slot.position > slot2.position:
-                    continue
-                if abs(aux_slot.position - slot2.position) != 1:
-                    break
-                combination.append(slot2)
-                combinations = self._add_combination(combinations, combination)
-                aux_slot = deepcopy(slot2)
+        for start, length in iter_mask_combinations(positions_to_mask(indexes)):
+            index = indexes[start]
+            combinations.append(slots[index : index + length])
         return combinations
 
     @staticmethod
@@ -215,70 +391,59 @@ class AvailabilityApi:
         if any(slot.day_id != slot0_day_id for slot in slots):
             raise NoSameDaySlots("Error: Slots don't belong to same day")
 
-    @staticmethod
-    def _add_combination(
-        combinations: List[List[domain.Slot]], combination: List[domain.Slot]
-    ) -> List[List[domain.Slot]]:
-        combinations.append(deepcopy(combination))
-        return combinations
-
-    @staticmethod
-    def _get_combinations_prices(
-        boat: Boat, day: domain.Day, combinations: List[List[domain.Slot]]
-    ) -> List[Decimal]:
-        day_definition = DjangoAvailabilityRepository.get_day_definition(
-            boat_id=boat.id, date_=day.date
-        )
-        hours_per_slot = day_definition.hours_per_slot
-        day_price_per_hour = DjangoAvailabilityRepository.get_price_per_hour(
-            boat=boat, date_=day.date
-        )
-        return [
-            len(combination) * hours_per_slot * day_price_per_hour
-            for combination in combinations
-        ]
-
     @staticmethod
     def _get_combinations_timing(
         day_definition: domain.DayDefinition,
         combinations: List[List[domain.Slot]],
     ) -> List[domain.SlotTiming]:
+        slot_timings = day_definition.slot_timings
+        n_slot_timings = len(slot_timings)
         slot_combination_hour_limits = []
         for combination in combinations:
             if len(combination) == 0:
                 raise CombinationOfSize0("Error: Combination of size 0")
-            elif len(combination) == 1:
-                slot_combination_hour_limits.append(
-                    DjangoAvailabilityRepository.get_slot_timing(
-                        day_definition=day_definition, slot=combination[0]
-                    )
-                )
-            elif len(combination) > 1:
-                from_hour = DjangoAvailabilityRepository.get_slot_timing(
-                    day_definition=day_definition, slot=combination[0]
-                ).from_hour
-                to_hour = DjangoAvailabilityRepository.get_slot_timing(
-                    day_definition=day_definition, slot=combination[-1]
-                ).to_hour
-                slot_combination_hour_limits.append(
-                    domain.SlotTiming(from_hour=from_hour, to_hour=to_hour)
-                )
+            first_position = combination[0].position
+            last_position = combination[-1].position
+            if last_position < n_slot_timings:
+                from_hour = slot_timings[first_position].from_hour
+                to_hour = slot_timings[last_position].to_hour
+            else:
+                from_hour = day_definition.get_slot_timing(first_position).from_hour
+                to_hour = day_definition.get_slot_timing(last_position).to_hour
+            slot_combination_hour_limits.append(
+                domain.SlotTiming(from_hour=from_hour, to_hour=to_hour)
+            )
         return slot_combination_hour_limits
 
+    def _get_days_availability_types(
+        self, boats: List[Boat], from_: date, to: date
+    ) -> Dict[Tuple[int, date], str]:
+        """
+        Availability type of every (boat, date) that has availability
+        between both dates, computed from slot counters
+        """
+        if from_ > to:
+            return {}
+        days_occupancy = self.availability_repository.filter_days_occupancy(
+            boat_ids=[boat.id for boat in boats], from_=from_, to=to
+        )
+        return {
+            (day_occupancy.boat_id, day_occupancy.date): day_occupancy.availability_type
+            for day_occupancy in days_occupancy
+        }
+
     @staticmethod
-    def _get_global_day_availability_type(boats: List[Boat], date_: date) -> str:
-        boats_day_availability_types = []
+    def _get_global_day_availability_type(
+        boats: List[Boat],
+        date_: date,
+        days_availability_types: Dict[Tuple[int, date], str],
+    ) -> str:
         if date_ < date.today():
             return DayAvailabilityTypes.NO_AVAIL
-        for boat in boats:
-            try:
-                boats_day_availability_types.append(
-                    DjangoAvailabilityRepository.get_day(
-                        boat=boat, date_=date_
-                    ).availability_type
-                )
-            except (NoDayDefinitionDefined, NoAvailabilityForDay):
-                boats_day_availability_types.append(DayAvailabilityTypes.NO_AVAIL)
+        boats_day_availability_types = [
+            days_availability_types.get((boat.id, date_), DayAvailabilityTypes.NO_AVAIL)
+            for boat in boats
+        ]
         if all(
             elem == boats_day_availability_types[0]
             for elem in boats_day_availability_types
@@ -310,23 +475,20 @@ class AvailabilityApi:
         return results
 
     @staticmethod
-    def _apply_discounts(
-        combination: List[domain.Slot],
-        theoretical_price: Decimal,
-        day_definition: domain.DayDefinition,
-        apply_resident_discount: bool,
-    ) -> Decimal:
-        price = theoretical_price
-        if (
-            len(combination) >= day_definition.n_slots_deal_threshold
-            and day_definition.discount_when_deal
-        ):
-            price = theoretical_price - theoretical_price * Decimal(
-                day_definition.discount_when_deal
-            )
-        if apply_resident_discount:
-            price = price - price * Decimal(day_definition.resident_discount)
-        return round(price, 2)
+    def _generate_no_availability_range(request: GetRangeAvailabilityRequest):
+        return [
+            {
+                "name": DayAvailabilityTypes.NO_AVAIL,
+                "date": idate,
+                "availability": False,
+            }
+            for idate in range_date_iter(request.from_date, request.to_date)
+        ]
 
 
-api = AvailabilityApi(DjangoAvailabilityRepository, ResponseBuilder)
+api = AvailabilityApi(
+    DjangoAvailabilityRepository,
+    ResponseBuilder,
+    ErrorResponseBuilder,
+    DjangoAvailabilityCache,
+)
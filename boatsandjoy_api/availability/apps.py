@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AvailabilityConfig(AppConfig):
     name = "boatsandjoy_api.availability"
     verbose_name = "Availability"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -2,51 +2,71 @@ from abc import ABC, abstractmethod
 from datetime import date
 from typing import List
 
+from django.db import transaction
+
 from boatsandjoy_api.boats.domain import Boat
+from .cache import DjangoAvailabilityCache
+from .domain import DeletedAvailability, GeneratedAvailability
 from .exceptions import NoDayDefinitionDefined
 from .repository import DjangoAvailabilityRepository
 
 
 class AvailabilityGeneratorInterface(ABC):
     @abstractmethod
-    def generate(self, year: int = date.today().year) -> List[dict]:
+    def generate(self, year: int = date.today().year) -> GeneratedAvailability:
         pass
 
     @abstractmethod
-    def delete(self, year: int = date.today().year):
+    def delete(
+        self, year: int = date.today().year, force: bool = False
+    ) -> DeletedAvailability:
         pass
 
 
 class AvailabilityGenerator(AvailabilityGeneratorInterface):
-    def __init__(self, boat: Boat):
-        self.boat = boat
-        self.day_definitions = DjangoAvailabilityRepository.filter_days_definitions(
-            boat_id=self.boat.id
-        )
-        if not self.day_definitions:
-            raise NoDayDefinitionDefined("This boat has not day definitions defined")
-
-    def generate(self, year: int = date.today().year) -> List[dict]:
-        start_date = date(year, 1, 1)
-        end_date = date(year, 12, 31)
-        days = DjangoAvailabilityRepository.create_days(
-            day_definitions=self.day_definitions, from_=start_date, to=end_date
+    def __init__(self, boats: List[Boat]):
+        self.boats = boats
+        self.day_definitions = []
+        boats_without_day_definitions = []
+        for boat in boats:
+            day_definitions = DjangoAvailabilityRepository.filter_days_definitions(
+                boat_id=boat.id
+            )
+            if not day_definitions:
+                boats_without_day_definitions.append(boat)
+            self.day_definitions.extend(day_definitions)
+        if boats_without_day_definitions:
+            boat_names = ", ".join(str(boat) for boat in boats_without_day_definitions)
+            raise NoDayDefinitionDefined(
+                f"Boats {boat_names} have not day definitions defined"
+            )
+
+    def generate(self, year: int = date.today().year) -> GeneratedAvailability:
+        """
+        Dates already generated are skipped, so it can be run again to fill
+        the days a new definition covers
+        """
+        generated_availability = DjangoAvailabilityRepository.create_availability(
+            day_definitions=self.day_definitions,
+            from_=date(year, 1, 1),
+            to=date(year, 12, 31),
         )
-        return [
-            {
-                "day": day,
-                "slots": DjangoAvailabilityRepository.create_slots(day=day),
-            }
-            for day in days
-        ]
-
-    def delete(self, year: int = date.today().year):
-        for day_definition in self.day_definitions:
-            days = list(filter(lambda day: day.date.year == year, day_definition.days))
-            DjangoAvailabilityRepository.delete_days(days)
-
-    def _exists_availability_for(self, year: int = date.today().year) -> bool:
-        for day_definition in self.day_definitions:
-            if any([day.date.year == year for day in day_definition.days]):
-                return True
-        return False
+        DjangoAvailabilityCache.invalidate_all()
+        return generated_availability
+
+    def delete(
+        self, year: int = date.today().year, force: bool = False
+    ) -> DeletedAvailability:
+        """
+        Refuses to delete days booked by confirmed bookings unless forced
+        """
+        n_days = n_slots = 0
+        with transaction.atomic():
+            for boat in self.boats:
+                deleted_availability = DjangoAvailabilityRepository.delete_availability(
+                    boat_id=boat.id, year=year, force=force
+                )
+                n_days += deleted_availability.n_days
+                n_slots += deleted_availability.n_slots
+        DjangoAvailabilityCache.invalidate_all()
+        return DeletedAvailability(n_days=n_days, n_slots=n_slots)
@@ -0,0 +1,272 @@
+import time
+from abc import ABC, abstractmethod
+from calendar import monthrange
+from collections import Counter
+from datetime import date
+from threading import Lock, local
+from typing import Callable, Iterable, Set
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+
+from boatsandjoy_api.core.cache import (
+    LocalVersion,
+    bump_version,
+    get_versions,
+    increment_counter,
+)
+
+
+class AvailabilityCache(ABC):
+    @classmethod
+    @abstractmethod
+    def get_or_build_day_availability(
+        cls,
+        date_: date,
+        apply_resident_discount: bool,
+        response_format: str,
+        build: Callable[[], dict],
+        stamp: str = None,
+    ) -> dict:
+        pass
+
+    @classmethod
+    @abstractmethod
+    def get_or_build_month_availability(
+        cls, year: int, month: int, build: Callable[[], dict], stamp: str = None
+    ) -> dict:
+        pass
+
+    @classmethod
+    @abstractmethod
+    def get_day_availability_stamp(
+        cls, date_: date, apply_resident_discount: bool, response_format: str
+    ) -> str:
+        pass
+
+    @classmethod
+    @abstractmethod
+    def get_month_availability_stamp(cls, year: int, month: int) -> str:
+        pass
+
+    @classmethod
+    @abstractmethod
+    def get_month_stats(cls) -> dict:
+        pass
+
+    @classmethod
+    @abstractmethod
+    def get_global_version(cls) -> str:
+        pass
+
+    @classmethod
+    @abstractmethod
+    def invalidate_dates(cls, dates: Iterable[date]):
+        pass
+
+    @classmethod
+    @abstractmethod
+    def invalidate_all(cls):
+        pass
+
+
+class DjangoAvailabilityCache(AvailabilityCache):
+    """
+    Responses are stored under keys that carry a global version, bumped when
+    boats, day definitions or price variations change, and a version per date
+    (or per month for calendars), bumped when the slots of that date change.
+    Old entries are never read again once their versions are bumped and just
+    expire. Months already in the past can't change, so they don't expire
+    """
+
+    KEY_PREFIX = "availability"
+    _global_version = LocalVersion(
+        lambda: DjangoAvailabilityCache._get_cache(), f"{KEY_PREFIX}:version"
+    )
+    _local = local()
+    _month_stats = Counter()
+    _month_stats_lock = Lock()
+    _month_stats_flushed_at = 0.0
+
+    @classmethod
+    def get_or_build_day_availability(
+        cls,
+        date_: date,
+        apply_resident_discount: bool,
+        response_format: str,
+        build: Callable[[], dict],
+        stamp: str = None,
+    ) -> dict:
+        """
+        :param stamp: the one of the day availability, when it's already known
+        """
+        cache = cls._get_cache()
+        if stamp is None:
+            stamp = cls.get_day_availability_stamp(
+                date_, apply_resident_discount, response_format
+            )
+        key = f"{cls.KEY_PREFIX}:{stamp}"
+        response = cache.get(key)
+        if response is None:
+            response = build()
+            cache.set(key, response, timeout=settings.AVAILABILITY_CACHE_TIMEOUT)
+        return response
+
+    @classmethod
+    def get_or_build_month_availability(
+        cls, year: int, month: int, build: Callable[[], dict], stamp: str = None
+    ) -> dict:
+        """
+        :param stamp: the one of the month availability, when it's already known
+        """
+        cache = cls._get_cache()
+        if stamp is None:
+            stamp = cls.get_month_availability_stamp(year, month)
+        key = f"{cls.KEY_PREFIX}:{stamp}"
+        timeout = None
+        if not cls._is_past_month(year, month):
+            timeout = settings.AVAILABILITY_CACHE_TIMEOUT
+
+        response = cache.get(key)
+        if response is None:
+            cls._count_month_request("misses")
+            response = build()
+            cache.set(key, response, timeout=timeout)
+        else:
+            cls._count_month_request("hits")
+        return response
+
+    @classmethod
+    def get_day_availability_stamp(
+        cls, date_: date, apply_resident_discount: bool, response_format: str
+    ) -> str:
+        """
+        Changes whenever the availability of the day could change, without
+        building it
+        """
+        global_version, date_version = get_versions(
+            cls._get_cache(),
+            [cls._get_global_version_key(), cls._get_date_version_key(date_)],
+        )
+        cls._global_version.set(global_version)
+        return (
+            f"day:{date_.isoformat()}:{int(apply_resident_discount)}:"
+            f"{response_format}:{global_version}:{date_version}"
+        )
+
+    @classmethod
+    def get_month_availability_stamp(cls, year: int, month: int) -> str:
+        """
+        Changes whenever the availability of the month could change, without
+        building it
+        """
+        if cls._is_past_month(year, month):
+            return f"month:{year}-{month}:past"
+        global_version, month_version = get_versions(
+            cls._get_cache(),
+            [cls._get_global_version_key(), cls._get_month_version_key(year, month)],
+        )
+        cls._global_version.set(global_version)
+        # Days already passed in the current month change as time goes by
+        return (
+            f"month:{year}-{month}:{max(date.today(), date(year, month, 1))}:"
+            f"{global_version}:{month_version}"
+        )
+
+    @classmethod
+    def get_month_stats(cls) -> dict:
+        cache = cls._get_cache()
+        return {
+            counter: cache.get(cls._get_month_stats_key(counter), 0)
+            for counter in ("hits", "misses")
+        }
+
+    @classmethod
+    def get_global_version(cls) -> str:
+        """
+        Tells when the day definitions and price variations kept in memory
+        must be reloaded. Stamps keep the version they read, so building a
+        response under a stamp uses the same one, without reading it again
+        """
+        return cls._global_version.get()
+
+    @classmethod
+    def invalidate_dates(cls, dates: Iterable[date]):
+        """
+        Versions are bumped once the current transaction commits, otherwise a
+        concurrent request could cache not yet committed data with them. Dates
+        invalidated many times in a transaction, like a day deleted with its
+        slots, are bumped once. Dates left pending by a rolled back
+        transaction are bumped with the next commit, which is harmless
+        """
+        cls._get_pending_dates().update(dates)
+        transaction.on_commit(cls._bump_pending_dates_versions)
+
+    @classmethod
+    def invalidate_all(cls):
+        transaction.on_commit(cls._global_version.bump)
+
+    @classmethod
+    def _count_month_request(cls, counter: str):
+        """
+        Hits and misses are counted per process and added to the shared
+        counters once per flush interval, so serving a cached month doesn't
+        write to the cache. Counts not flushed yet are lost if the process
+        exits
+        """
+        with cls._month_stats_lock:
+            DjangoAvailabilityCache._month_stats[counter] += 1
+            now = time.monotonic()
+            flush_interval = settings.AVAILABILITY_CACHE_STATS_FLUSH_INTERVAL
+            if now - DjangoAvailabilityCache._month_stats_flushed_at < flush_interval:
+                return
+            month_stats = DjangoAvailabilityCache._month_stats
+            DjangoAvailabilityCache._month_stats = Counter()
+            DjangoAvailabilityCache._month_stats_flushed_at = now
+
+        cache = cls._get_cache()
+        for counter, n_requests in month_stats.items():
+            increment_counter(cache, cls._get_month_stats_key(counter), n_requests)
+
+    @classmethod
+    def _bump_pending_dates_versions(cls):
+        dates = cls._get_pending_dates()
+        if not dates:
+            return
+        cls._local.pending_dates = set()
+        cache = cls._get_cache()
+        for date_ in dates:
+            bump_version(cache, cls._get_date_version_key(date_))
+        for year, month in {(date_.year, date_.month) for date_ in dates}:
+            bump_version(cache, cls._get_month_version_key(year, month))
+
+    @classmethod
+    def _get_pending_dates(cls) -> Set[date]:
+        if not hasattr(cls._local, "pending_dates"):
+            cls._local.pending_dates = set()
+        return cls._local.pending_dates
+
+    @staticmethod
+    def _get_cache() -> BaseCache:
+        return caches[settings.AVAILABILITY_CACHE]
+
+    @staticmethod
+    def _is_past_month(year: int, month: int) -> bool:
+        return date(year, month, monthrange(year, month)[1]) < date.today()
+
+    @classmethod
+    def _get_global_version_key(cls) -> str:
+        return f"{cls.KEY_PREFIX}:version"
+
+    @classmethod
+    def _get_date_version_key(cls, date_: date) -> str:
+        return f"{cls.KEY_PREFIX}:version:{date_.isoformat()}"
+
+    @classmethod
+    def _get_month_version_key(cls, year: int, month: int) -> str:
+        return f"{cls.KEY_PREFIX}:version:{year}-{month}"
+
+    @classmethod
+    def _get_month_stats_key(cls, counter: str) -> str:
+        return f"{cls.KEY_PREFIX}:month:{counter}"
@@ -0,0 +1,41 @@
+from typing import Iterable, Iterator, Optional, Tuple
+
+
+def positions_to_mask(positions: Iterable[int]) -> int:
+    """
+    Bitmap with the bit of every position set
+    """
+    mask = 0
+    for position in positions:
+        mask |= 1 << position
+    return mask
+
+
+def iter_mask_runs(mask: int) -> Iterator[Tuple[int, int]]:
+    """
+    Yields a (start, length) span for every run of consecutive set bits.
+    Here start is a position, not an index
+    """
+    while mask:
+        start = (mask & -mask).bit_length() - 1
+        run = mask >> start
+        length = (~run & (run + 1)).bit_length() - 1
+        yield start, length
+        mask &= ~(((1 << length) - 1) << start)
+
+
+def iter_mask_combinations(
+    mask: int, min_length: int = 1, max_length: Optional[int] = None
+) -> Iterator[Tuple[int, int]]:
+    """
+    Yields a (start, length) span for every combination of correlated free
+    positions of the bitmap, ordered by start and then by length
+    """
+    for run_start, run_length in iter_mask_runs(mask):
+        run_end = run_start + run_length
+        for start in range(run_start, run_end):
+            longest = run_end - start
+            if max_length is not None:
+                longest = min(longest, max_length)
+            for length in range(min_length, longest + 1):
+                yield start, length
@@ -40,3 +40,31 @@ class DayAvailabilityTypes:
         (PARTIALLY_FREE, "Partially free"),
         (NO_AVAIL, "No availability"),
     )
+
+
+class AvailabilityResponseFormats:
+    VERBOSE = "verbose"
+    COMPACT = "compact"
+
+    LIST = ((VERBOSE, "Verbose"), (COMPACT, "Compact"))
+
+
+class AvailabilityJobActions:
+    GENERATE = "generate"
+    DELETE = "delete"
+
+    LIST = ((GENERATE, "Generate"), (DELETE, "Delete"))
+
+
+class AvailabilityJobStatus:
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    LIST = (
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
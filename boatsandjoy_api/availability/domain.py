@@ -1,13 +1,23 @@
 from collections import namedtuple
 from dataclasses import dataclass
-from datetime import date, time
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
 
 from .constants import DayAvailabilityTypes
 
 
-@dataclass
+def get_availability_type(n_total_slots: int, n_booked_slots: int) -> str:
+    if n_booked_slots == n_total_slots:
+        return DayAvailabilityTypes.FULL
+    elif n_booked_slots > 0:
+        return DayAvailabilityTypes.PARTIALLY_FREE
+    else:
+        return DayAvailabilityTypes.FREE
+
+
+@dataclass(frozen=True, slots=True)
 class Slot:
     id: int
     position: int
@@ -17,26 +27,51 @@ class Slot:
     day_id: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Day:
     id: int
     date: date
     day_definition_id: int
     slots: List[Slot]
+    slots_mask: int = 0
+    booked_mask: int = 0
+
+    @property
+    def free_mask(self) -> int:
+        return self.slots_mask & ~self.booked_mask
+
+    @property
+    def availability_type(self):
+        return get_availability_type(
+            self.slots_mask.bit_count(), self.booked_mask.bit_count()
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class DayOccupancy:
+    boat_id: int
+    date: date
+    total_slots: int
+    booked_slots: int
 
     @property
     def availability_type(self):
-        n_booked_slots = len(list(filter(lambda slot: slot.booked, self.slots)))
-        n_total_slots = len(self.slots)
-        if n_booked_slots == n_total_slots:
-            return DayAvailabilityTypes.FULL
-        elif n_booked_slots > 0:
-            return DayAvailabilityTypes.PARTIALLY_FREE
-        else:
-            return DayAvailabilityTypes.FREE
+        return get_availability_type(self.total_slots, self.booked_slots)
+
+
+@dataclass(frozen=True, slots=True)
+class GeneratedAvailability:
+    n_days: int
+    n_slots: int
+
+
+@dataclass(frozen=True, slots=True)
+class DeletedAvailability:
+    n_days: int
+    n_slots: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DayDefinition:
     id: int
     first_time: time
@@ -46,13 +81,25 @@ class DayDefinition:
     from_date: date
     to_date: date
     boat_id: int
-    days: List[Day]
     n_slots_deal_threshold: int
     discount_when_deal: float
     resident_discount: float
 
+    @property
+    def slot_timings(self) -> Tuple["SlotTiming", ...]:
+        """
+        Timing of every slot position of the definition
+        """
+        return get_slot_timings(self.first_time, self.hours_per_slot, self.n_slots)
+
+    def get_slot_timing(self, position: int) -> "SlotTiming":
+        slot_timings = self.slot_timings
+        if 0 <= position < len(slot_timings):
+            return slot_timings[position]
+        return calculate_slot_timing(self.first_time, self.hours_per_slot, position)
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PriceVariation:
     from_date: date
     to_date: date
@@ -60,5 +107,53 @@ class PriceVariation:
     boat_id: int
 
 
+@dataclass(frozen=True, slots=True)
+class PriceTable:
+    """
+    Prices indexed by the number of slots of the combination
+    """
+
+    price_per_hour: Decimal
+    prices: Tuple[Decimal, ...]
+    resident_prices: Tuple[Decimal, ...]
+
+    def get_price(self, n_slots: int, apply_resident_discount: bool) -> Decimal:
+        if apply_resident_discount:
+            return self.resident_prices[n_slots]
+        return self.prices[n_slots]
+
+
+@dataclass(frozen=True, slots=True)
+class BoatDay:
+    boat_id: int
+    day: Day
+    day_definition: DayDefinition
+    price_variations: List[PriceVariation]
+
+
 SlotTiming = namedtuple("SlotTiming", ["from_hour", "to_hour"])
 DateRange = namedtuple("DateRange", ["from_date", "to_date"])
+
+
+def calculate_slot_timing(
+    first_time: time, hours_per_slot: int, position: int
+) -> SlotTiming:
+    delta = timedelta(hours=hours_per_slot * position)
+    from_hour = (datetime.combine(date(1, 1, 1), first_time) + delta).time()
+    delta2 = timedelta(hours=hours_per_slot)
+    to_hour = (datetime.combine(date(1, 1, 1), from_hour) + delta2).time()
+    return SlotTiming(from_hour=from_hour, to_hour=to_hour)
+
+
+@lru_cache(maxsize=256)
+def get_slot_timings(
+    first_time: time, hours_per_slot: int, n_slots: int
+) -> Tuple[SlotTiming, ...]:
+    """
+    Cached by the fields slot timings depend on, so editing a definition
+    just makes it use another table
+    """
+    return tuple(
+        calculate_slot_timing(first_time, hours_per_slot, position)
+        for position in range(n_slots)
+    )
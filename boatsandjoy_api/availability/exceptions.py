@@ -27,3 +27,7 @@ class NoSlotsAvailable(AvailabilityApiException):
 
 class AvailabilityAlreadyCreated(AvailabilityApiException):
     pass
+
+
+class AvailabilityWithConfirmedBookings(AvailabilityApiException):
+    pass
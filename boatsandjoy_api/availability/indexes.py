@@ -0,0 +1,83 @@
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Generic, Iterable, List, Tuple, TypeVar
+
+from . import domain
+
+T = TypeVar("T")
+
+
+class IntervalIndex(Generic[T]):
+    """
+    Date intervals sorted by start with the running maximum of their ends,
+    so the intervals covering a date are found with a bisect and a walk back
+    that stops as soon as no earlier interval can reach that date
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[int, date, date, T]]):
+        """
+        :param intervals: (id, from_date, to_date, value) tuples
+        """
+        self._intervals = sorted(intervals, key=lambda interval: interval[1:3])
+        self._from_dates = [interval[1] for interval in self._intervals]
+        self._max_to_dates = []
+        max_to_date = date.min
+        for interval in self._intervals:
+            max_to_date = max(max_to_date, interval[2])
+            self._max_to_dates.append(max_to_date)
+
+    def find(self, date_: date) -> List[T]:
+        """
+        Values covering the date ordered by id
+        """
+        matches = []
+        for i in range(bisect_right(self._from_dates, date_) - 1, -1, -1):
+            if self._max_to_dates[i] < date_:
+                break
+            if self._intervals[i][2] >= date_:
+                matches.append(self._intervals[i])
+        matches.sort(key=lambda interval: interval[0])
+        return [value for _, _, _, value in matches]
+
+
+class AvailabilityIndexes:
+    """
+    Day definitions and price variations of every boat indexed by date
+    """
+
+    def __init__(
+        self,
+        version: str,
+        day_definitions: Iterable[Tuple[int, domain.DayDefinition]],
+        price_variations: Iterable[Tuple[int, domain.PriceVariation]],
+    ):
+        self.version = version
+        self._day_definitions = self._build_indexes(day_definitions)
+        self._price_variations = self._build_indexes(price_variations)
+
+    def find_day_definitions(
+        self, boat_id: int, date_: date
+    ) -> List[domain.DayDefinition]:
+        if boat_id not in self._day_definitions:
+            return []
+        return self._day_definitions[boat_id].find(date_)
+
+    def find_price_variations(
+        self, boat_id: int, date_: date
+    ) -> List[domain.PriceVariation]:
+        if boat_id not in self._price_variations:
+            return []
+        return self._price_variations[boat_id].find(date_)
+
+    @staticmethod
+    def _build_indexes(rows: Iterable[Tuple[int, T]]) -> Dict[int, IntervalIndex[T]]:
+        intervals_by_boat = defaultdict(list)
+        for obj_id, obj in rows:
+            intervals_by_boat[obj.boat_id].append(
+                (obj_id, obj.from_date, obj.to_date, obj)
+            )
+        return {
+            boat_id: IntervalIndex(intervals)
+            for boat_id, intervals in intervals_by_boat.items()
+        }
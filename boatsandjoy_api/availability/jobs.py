@@ -0,0 +1,153 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timedelta
+from multiprocessing import get_context
+from typing import Iterable, Optional, Tuple
+
+import django
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from boatsandjoy_api.boats.models import Boat
+from boatsandjoy_api.core.exceptions import BoatsAndJoyException
+from boatsandjoy_api.core.utils import try_advisory_xact_lock
+from .availability_generators import AvailabilityGenerator
+from .constants import AvailabilityJobActions, AvailabilityJobStatus
+from .models import AvailabilityJob
+
+
+def enqueue_job(
+    action: str, boats: Iterable[Boat], year: int, force: bool = False
+) -> AvailabilityJob:
+    boats = list(boats)
+    with transaction.atomic():
+        job = AvailabilityJob.objects.create(
+            action=action, year=year, force=force, n_boats=len(boats)
+        )
+        job.boats.set(boats)
+    return job
+
+
+def claim_job() -> Optional[AvailabilityJob]:
+    """
+    Takes the oldest pending job. Workers on other nodes skip the rows that
+    are being claimed instead of waiting for them
+    """
+    with transaction.atomic():
+        job = (
+            AvailabilityJob.objects.select_for_update(skip_locked=True)
+            .filter(status=AvailabilityJobStatus.PENDING)
+            .order_by("created")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = AvailabilityJobStatus.RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "started_at", "modified"])
+    return job
+
+
+def requeue_stalled_jobs() -> int:
+    """
+    Running jobs are saved at least once per heartbeat interval. The ones not
+    saved for AVAILABILITY_JOB_TIMEOUT lost their worker and are put back as
+    pending. Processing boats again is safe, generation skips existing days
+    and deletion finds nothing to delete
+
+    :return: number of jobs requeued
+    """
+    stalled_since = timezone.now() - timedelta(
+        seconds=settings.AVAILABILITY_JOB_TIMEOUT
+    )
+    return AvailabilityJob.objects.filter(
+        status=AvailabilityJobStatus.RUNNING, modified__lt=stalled_since
+    ).update(
+        status=AvailabilityJobStatus.PENDING,
+        n_processed_boats=0,
+        messages=Concat(F("messages"), Value("Requeued, its worker stopped\n")),
+        started_at=None,
+        modified=timezone.now(),
+    )
+
+
+def run_job(job: AvailabilityJob, max_workers: int = None):
+    """
+    Boats are processed in parallel, each one in its own process and
+    transaction, and the job is updated as they finish, or just touched every
+    heartbeat interval while they don't
+    """
+    boat_ids = list(job.boats.values_list("id", flat=True))
+    failed = False
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=get_context("spawn"),
+            initializer=django.setup,
+        ) as executor:
+            futures = {
+                executor.submit(
+                    process_boat, job.action, boat_id, job.year, job.force
+                ): boat_id
+                for boat_id in boat_ids
+            }
+            pending = set(futures)
+            while pending:
+                done, pending = wait(
+                    pending,
+                    timeout=settings.AVAILABILITY_JOB_HEARTBEAT_INTERVAL,
+                    return_when=FIRST_COMPLETED,
+                )
+                if not done:
+                    job.save(update_fields=["modified"])
+                for future in done:
+                    try:
+                        processed, message = future.result()
+                    except Exception as e:
+                        processed, message = False, f"Boat {futures[future]}: {e!r}"
+                    failed = failed or not processed
+                    job.n_processed_boats += 1
+                    job.messages += f"{message}\n"
+                    job.save(
+                        update_fields=["n_processed_boats", "messages", "modified"]
+                    )
+    except BaseException as e:
+        failed = True
+        job.messages += f"Job interrupted: {e!r}\n"
+        raise
+    finally:
+        if failed:
+            job.status = AvailabilityJobStatus.FAILED
+        else:
+            job.status = AvailabilityJobStatus.DONE
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "messages", "finished_at", "modified"])
+
+
+def process_boat(
+    action: str, boat_id: int, year: int, force: bool = False
+) -> Tuple[bool, str]:
+    """
+    :return: whether the boat was processed and a message for the job
+    """
+    boat = Boat.objects.get(id=boat_id)
+    try:
+        with transaction.atomic():
+            if not try_advisory_xact_lock(boat_id, year):
+                return False, f"{boat}: {year} is being processed by another job"
+            availability_generator = AvailabilityGenerator([boat])
+            if action == AvailabilityJobActions.GENERATE:
+                generated_availability = availability_generator.generate(year)
+                return True, (
+                    f"{boat}: {generated_availability.n_days} days and "
+                    f"{generated_availability.n_slots} slots generated"
+                )
+            deleted_availability = availability_generator.delete(year, force)
+            return True, (
+                f"{boat}: {deleted_availability.n_days} days and "
+                f"{deleted_availability.n_slots} slots deleted"
+            )
+    except BoatsAndJoyException as e:
+        return False, f"{boat}: {e}"
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from boatsandjoy_api.availability.cache import DjangoAvailabilityCache
+
+
+class Command(BaseCommand):
+    help = "Shows month availability cache hits and misses"
+
+    def handle(self, *args, **options):
+        stats = DjangoAvailabilityCache.get_month_stats()
+        requests = stats["hits"] + stats["misses"]
+        hit_ratio = stats["hits"] / requests if requests else 0
+        self.stdout.write(
+            f"Month availability cache: {stats['hits']} hits, "
+            f"{stats['misses']} misses ({hit_ratio:.1%} hit ratio)"
+        )
@@ -0,0 +1,77 @@
+from copy import deepcopy
+from datetime import time
+from timeit import Timer
+from typing import List
+
+from django.core.management.base import BaseCommand
+
+from boatsandjoy_api.availability import domain
+from boatsandjoy_api.availability.api import api
+
+
+def get_combinations_with_copies(slots: List[domain.Slot]) -> List[List[domain.Slot]]:
+    """
+    Former AvailabilityApi._get_combinations implementation, kept as reference
+    """
+    slots = sorted(slots, key=lambda slot: slot.position)
+    combinations = []
+    for slot1 in slots:
+        combination = [slot1]
+        combinations.append(deepcopy(combination))
+        aux_slot = deepcopy(slot1)
+        for slot2 in slots:
+            if aux_slot.position == slot2.position:
+                continue
+            if aux_slot.position > slot2.position:
+                continue
+            if abs(aux_slot.position - slot2.position) != 1:
+                break
+            combination.append(slot2)
+            combinations.append(deepcopy(combination))
+            aux_slot = deepcopy(slot2)
+    return combinations
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the former slot combination generator with the bitmap one "
+        "for several day sizes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--n-slots", type=int, nargs="+", default=[4, 8, 12, 16, 24, 32, 48]
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'n_slots':>8} {'combinations':>13} {'copies (ms)':>12} "
+            f"{'masks (ms)':>11} {'speedup':>8}"
+        )
+        for n_slots in options["n_slots"]:
+            slots = [
+                domain.Slot(
+                    id=position,
+                    position=position,
+                    from_hour=time(0),
+                    to_hour=time(0),
+                    booked=False,
+                    day_id=1,
+                )
+                for position in range(n_slots)
+            ]
+            n_combinations = len(api._get_combinations(slots))
+            assert n_combinations == len(get_combinations_with_copies(slots))
+            copies_time = self._time(get_combinations_with_copies, slots, options)
+            masks_time = self._time(api._get_combinations, slots, options)
+            self.stdout.write(
+                f"{n_slots:>8} {n_combinations:>13} {copies_time * 1000:>12.3f} "
+                f"{masks_time * 1000:>11.3f} {copies_time / masks_time:>7.1f}x"
+            )
+
+    @staticmethod
+    def _time(function, slots: List[domain.Slot], options: dict) -> float:
+        timer = Timer(lambda: function(slots))
+        number, _ = timer.autorange()
+        return min(timer.repeat(repeat=options["repeat"], number=number)) / number
@@ -0,0 +1,108 @@
+import time as timer
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, time, timedelta
+from typing import List
+
+from django.core.management.base import BaseCommand
+
+from boatsandjoy_api.availability import domain
+
+
+@dataclass
+class Slot:
+    """
+    Former domain.Slot, kept as reference
+    """
+
+    id: int
+    position: int
+    from_hour: time
+    to_hour: time
+    booked: bool
+    day_id: int
+
+
+@dataclass
+class Day:
+    """
+    Former domain.Day, kept as reference
+    """
+
+    id: int
+    date: date
+    day_definition_id: int
+    slots: List[Slot]
+    slots_mask: int = 0
+    booked_mask: int = 0
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares memory and time to build a season of days and slots with "
+        "plain and slotted frozen domain dataclasses"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--boats", type=int, default=10)
+        parser.add_argument("--days", type=int, default=183)
+        parser.add_argument("--n-slots", type=int, default=12)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'classes':>8} {'objects':>8} {'memory (KiB)':>13} "
+            f"{'peak (KiB)':>11} {'blocks':>8} {'time (ms)':>10}"
+        )
+        for name, day_class, slot_class in (
+            ("plain", Day, Slot),
+            ("slotted", domain.Day, domain.Slot),
+        ):
+            start = timer.perf_counter()
+            days = self._build_season(day_class, slot_class, options)
+            elapsed = timer.perf_counter() - start
+            del days
+
+            tracemalloc.start()
+            days = self._build_season(day_class, slot_class, options)
+            memory, peak = tracemalloc.get_traced_memory()
+            blocks = sum(
+                stat.count
+                for stat in tracemalloc.take_snapshot().statistics("filename")
+            )
+            tracemalloc.stop()
+            n_objects = len(days) * (options["n_slots"] + 1)
+            self.stdout.write(
+                f"{name:>8} {n_objects:>8} {memory / 1024:>13.1f} "
+                f"{peak / 1024:>11.1f} {blocks:>8} {elapsed * 1000:>10.1f}"
+            )
+            del days
+
+    @staticmethod
+    def _build_season(day_class: type, slot_class: type, options: dict) -> list:
+        first_date = date(date.today().year, 4, 1)
+        slot_timings = domain.get_slot_timings(time(8), 1, options["n_slots"])
+        days = []
+        for boat in range(options["boats"]):
+            for n in range(options["days"]):
+                day_id = boat * options["days"] + n
+                slots = [
+                    slot_class(
+                        id=day_id * options["n_slots"] + position,
+                        position=position,
+                        from_hour=slot_timing.from_hour,
+                        to_hour=slot_timing.to_hour,
+                        booked=False,
+                        day_id=day_id,
+                    )
+                    for position, slot_timing in enumerate(slot_timings)
+                ]
+                days.append(
+                    day_class(
+                        id=day_id,
+                        date=first_date + timedelta(n),
+                        day_definition_id=boat,
+                        slots=slots,
+                        slots_mask=(1 << options["n_slots"]) - 1,
+                    )
+                )
+        return days
@@ -0,0 +1,47 @@
+from timeit import Timer
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from boatsandjoy_api.availability.api import api as availability_api
+from boatsandjoy_api.availability.requests import GetDayAvailabilityRequest
+from boatsandjoy_api.core.renderers import ORJSONRenderer
+from boatsandjoy_api.core.utils import cast_to_date
+
+
+class Command(BaseCommand):
+    help = "Compares JSON renderers on the day availability payload of some dates"
+
+    def add_arguments(self, parser):
+        parser.add_argument("dates", nargs="+", help="Dates as YYYY-MM-DD")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'date':>10} {'resident':>8} {'bytes':>8} {'json (ms)':>10} "
+            f"{'orjson (ms)':>12} {'speedup':>8}"
+        )
+        for date_ in options["dates"]:
+            for apply_resident_discount in (False, True):
+                payload = availability_api.get_day_availability(
+                    GetDayAvailabilityRequest(
+                        date=cast_to_date(date_),
+                        apply_resident_discount=apply_resident_discount,
+                    )
+                )
+                rendered = ORJSONRenderer().render(payload)
+                if rendered != JSONRenderer().render(payload):
+                    raise CommandError(f"Renderers output differ for {date_}")
+                json_time = self._time(JSONRenderer(), payload, options)
+                orjson_time = self._time(ORJSONRenderer(), payload, options)
+                self.stdout.write(
+                    f"{date_:>10} {apply_resident_discount!s:>8} "
+                    f"{len(rendered):>8} {json_time * 1000:>10.3f} "
+                    f"{orjson_time * 1000:>12.3f} {json_time / orjson_time:>7.1f}x"
+                )
+
+    @staticmethod
+    def _time(renderer: JSONRenderer, payload: dict, options: dict) -> float:
+        timer = Timer(lambda: renderer.render(payload))
+        number, _ = timer.autorange()
+        return min(timer.repeat(repeat=options["repeat"], number=number)) / number
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from boatsandjoy_api.availability.models import Day
+from boatsandjoy_api.availability.repository import DjangoAvailabilityRepository
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds or verifies days slot bitmaps and occupancy counters from "
+        "their slots"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Just report days out of sync without fixing them",
+        )
+        parser.add_argument("--boat", type=int, help="Boat id to restrict to")
+        parser.add_argument("--year", type=int, help="Year to restrict to")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        days = Day.objects.order_by("id")
+        if options["boat"]:
+            days = days.filter(boat_id=options["boat"])
+        if options["year"]:
+            days = days.filter(date__year=options["year"])
+        day_ids = list(days.values_list("id", flat=True))
+
+        chunk_size = options["chunk_size"]
+        n_out_of_sync = 0
+        for i in range(0, len(day_ids), chunk_size):
+            with transaction.atomic():
+                n_out_of_sync += DjangoAvailabilityRepository.refresh_days_occupancy(
+                    day_ids=day_ids[i : i + chunk_size], dry_run=options["verify"]
+                )
+
+        if options["verify"]:
+            if n_out_of_sync:
+                raise CommandError(
+                    f"{n_out_of_sync} of {len(day_ids)} days bitmaps or occupancy "
+                    f"counters are out of sync"
+                )
+            self.stdout.write(self.style.SUCCESS(f"{len(day_ids)} days in sync"))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"{n_out_of_sync} of {len(day_ids)} days rebuilt")
+            )
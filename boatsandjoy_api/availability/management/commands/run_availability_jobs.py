@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from boatsandjoy_api.availability.jobs import (
+    claim_job,
+    requeue_stalled_jobs,
+    run_job,
+)
+
+
+class Command(BaseCommand):
+    help = "Runs the pending availability generation and deletion jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Number of boats processed in parallel (CPU count by default)",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5,
+            help="Seconds to wait before looking for new jobs again",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once there are no pending jobs",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            n_requeued_jobs = requeue_stalled_jobs()
+            if n_requeued_jobs:
+                self.stdout.write(f"{n_requeued_jobs} stalled jobs requeued")
+            job = claim_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.stdout.write(f"Running job {job.id}: {job}")
+            run_job(job, max_workers=options["workers"])
+            self.stdout.write(
+                f"Job {job.id} {job.get_status_display().lower()}\n{job.messages}"
+            )
@@ -0,0 +1,112 @@
+# Generated by Django 3.2 on 2026-10-18 12:52
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+import django.db.models.deletion
+
+
+def get_availability_type(total_slots, booked_slots):
+    if booked_slots == total_slots:
+        return "full"
+    elif booked_slots > 0:
+        return "partially_free"
+    return "free"
+
+
+def populate_days_occupancy(apps, schema_editor):
+    Day = apps.get_model("availability", "Day")
+    DayOccupancy = apps.get_model("availability", "DayOccupancy")
+    days = (
+        Day.objects.order_by()
+        .values("id", "definition__boat_id", "date")
+        .annotate(
+            total_slots=Count("slots"),
+            booked_slots=Count("slots", filter=Q(slots__booked=True)),
+        )
+    )
+    DayOccupancy.objects.bulk_create(
+        (
+            DayOccupancy(
+                day_id=day["id"],
+                boat_id=day["definition__boat_id"],
+                date=day["date"],
+                total_slots=day["total_slots"],
+                booked_slots=day["booked_slots"],
+                availability_type=get_availability_type(
+                    day["total_slots"], day["booked_slots"]
+                ),
+            )
+            for day in days.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("boats", "0001_initial"),
+        ("availability", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DayOccupancy",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+                ("date", models.DateField()),
+                ("total_slots", models.IntegerField(default=0)),
+                ("booked_slots", models.IntegerField(default=0)),
+                (
+                    "availability_type",
+                    models.CharField(
+                        choices=[
+                            ("free", "Free"),
+                            ("full", "Full"),
+                            ("partially_free", "Partially free"),
+                            ("no_availability", "No availability"),
+                        ],
+                        default="free",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "boat",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="days_occupancy",
+                        to="boats.boat",
+                    ),
+                ),
+                (
+                    "day",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occupancy",
+                        to="availability.day",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "day occupancy",
+                "verbose_name_plural": "days occupancy",
+                "ordering": ("date",),
+            },
+        ),
+        migrations.AddIndex(
+            model_name="dayoccupancy",
+            index=models.Index(
+                fields=["boat", "date"], name="availabilit_boat_id_7b0ba2_idx"
+            ),
+        ),
+        migrations.RunPython(populate_days_occupancy, migrations.RunPython.noop),
+    ]
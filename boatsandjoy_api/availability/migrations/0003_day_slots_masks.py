@@ -0,0 +1,59 @@
+# Generated by Django 3.2 on 2026-10-18 12:58
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def populate_days_masks(apps, schema_editor):
+    Day = apps.get_model("availability", "Day")
+    Slot = apps.get_model("availability", "Slot")
+    slots = (
+        Slot.objects.order_by("day_id")
+        .values_list("day_id", "position", "booked")
+        .iterator()
+    )
+    days, day = [], None
+    for day_id, position, booked in slots:
+        if day is None or day.id != day_id:
+            day = Day(id=day_id, slots_mask=0, booked_mask=0)
+            days.append(day)
+        day.slots_mask |= 1 << position
+        if booked:
+            day.booked_mask |= 1 << position
+    Day.objects.bulk_update(days, ["slots_mask", "booked_mask"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("availability", "0002_dayoccupancy"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="day",
+            name="booked_mask",
+            field=models.BigIntegerField(
+                default=0, help_text="Bitmap of the positions of the booked slots"
+            ),
+        ),
+        migrations.AddField(
+            model_name="day",
+            name="slots_mask",
+            field=models.BigIntegerField(
+                default=0, help_text="Bitmap of the positions of the slots of the day"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="daydefinition",
+            name="n_slots",
+            field=models.IntegerField(
+                default=0,
+                help_text="Number of availability slots in a single day",
+                validators=[
+                    django.core.validators.MaxValueValidator(63),
+                    django.core.validators.MinValueValidator(0),
+                ],
+            ),
+        ),
+        migrations.RunPython(populate_days_masks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2 on 2026-10-18 13:40
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def populate_days_boat(apps, schema_editor):
+    Day = apps.get_model("availability", "Day")
+    DayDefinition = apps.get_model("availability", "DayDefinition")
+    Day.objects.update(
+        boat_id=Subquery(
+            DayDefinition.objects.filter(id=OuterRef("definition_id")).values(
+                "boat_id"
+            )[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("boats", "0001_initial"),
+        ("availability", "0003_day_slots_masks"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="day",
+            name="boat",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="days",
+                to="boats.boat",
+            ),
+        ),
+        migrations.RunPython(populate_days_boat, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.2 on 2026-10-18 13:40
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def check_duplicated_days(apps, schema_editor):
+    Day = apps.get_model("availability", "Day")
+    duplicated_days = list(
+        Day.objects.order_by()
+        .values("boat_id", "date")
+        .annotate(n_days=Count("id"))
+        .filter(n_days__gt=1)[:10]
+    )
+    if duplicated_days:
+        raise RuntimeError(
+            "There are boats with more than one day for the same date, remove "
+            f"them before applying this migration: {duplicated_days}"
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("availability", "0004_day_boat"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicated_days, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="day",
+            name="boat",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="days",
+                to="boats.boat",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="day",
+            constraint=models.UniqueConstraint(
+                fields=("boat", "date"), name="unique_boat_day"
+            ),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 3.2 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("boats", "0001_initial"),
+        ("availability", "0005_unique_boat_day"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AvailabilityJob",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[("generate", "Generate"), ("delete", "Delete")],
+                        max_length=20,
+                    ),
+                ),
+                ("year", models.IntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "n_boats",
+                    models.IntegerField(
+                        default=0, help_text="Number of boats to process"
+                    ),
+                ),
+                (
+                    "n_processed_boats",
+                    models.IntegerField(
+                        default=0, help_text="Number of boats already processed"
+                    ),
+                ),
+                ("messages", models.TextField(blank=True, default="")),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "boats",
+                    models.ManyToManyField(
+                        related_name="availability_jobs", to="boats.Boat"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "availability job",
+                "verbose_name_plural": "availability jobs",
+                "ordering": ("-created",),
+            },
+        ),
+        migrations.AddIndex(
+            model_name="availabilityjob",
+            index=models.Index(
+                fields=["status", "created"], name="availabilit_status_837e62_idx"
+            ),
+        ),
+    ]
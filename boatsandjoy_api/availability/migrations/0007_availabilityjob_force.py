@@ -0,0 +1,20 @@
+# Generated by Django 3.2 on 2026-10-18 14:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("availability", "0006_availabilityjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="availabilityjob",
+            name="force",
+            field=models.BooleanField(
+                default=False,
+                help_text="Delete availability even if there are confirmed bookings",
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2 on 2026-10-18 14:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("availability", "0007_availabilityjob_force"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="daydefinition",
+            index=models.Index(
+                fields=["boat", "from_date", "to_date"],
+                name="availabilit_boat_id_f39ece_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pricevariation",
+            index=models.Index(
+                fields=["boat", "from_date", "to_date"],
+                name="availabilit_boat_id_47b179_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="slot",
+            index=models.Index(
+                fields=["day", "position"],
+                include=("booked",),
+                name="slot_day_position_idx",
+            ),
+        ),
+    ]
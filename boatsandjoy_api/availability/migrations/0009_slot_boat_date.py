@@ -0,0 +1,41 @@
+# Generated by Django 3.2 on 2026-10-18 15:00
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def populate_slots_boat_and_date(apps, schema_editor):
+    Day = apps.get_model("availability", "Day")
+    Slot = apps.get_model("availability", "Slot")
+    days = Day.objects.filter(id=OuterRef("day_id"))
+    Slot.objects.update(
+        boat_id=Subquery(days.values("boat_id")[:1]),
+        date=Subquery(days.values("date")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("boats", "0001_initial"),
+        ("availability", "0008_lookup_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="slot",
+            name="boat",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="slots",
+                to="boats.boat",
+            ),
+        ),
+        migrations.AddField(
+            model_name="slot",
+            name="date",
+            field=models.DateField(null=True, help_text="Date of the day of the slot"),
+        ),
+        migrations.RunPython(populate_slots_boat_and_date, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2 on 2026-10-18 15:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("availability", "0009_slot_boat_date"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="slot",
+            name="boat",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="slots",
+                to="boats.boat",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="slot",
+            name="date",
+            field=models.DateField(help_text="Date of the day of the slot"),
+        ),
+        migrations.AddIndex(
+            model_name="slot",
+            index=models.Index(
+                fields=["boat", "date"], name="availabilit_boat_id_be0141_idx"
+            ),
+        ),
+    ]
@@ -6,6 +6,11 @@ from django.db import models
 
 from boatsandjoy_api.boats.models import Boat
 from boatsandjoy_api.core.models import BaseModel
+from .constants import (
+    AvailabilityJobActions,
+    AvailabilityJobStatus,
+    DayAvailabilityTypes,
+)
 
 
 class DayDefinition(BaseModel):
@@ -26,7 +31,10 @@ class DayDefinition(BaseModel):
         help_text="How many hours define a slot",
     )
     n_slots = models.IntegerField(
-        default=0, help_text="Number of availability slots in a single day"
+        default=0,
+        # Slot positions have to fit into the bitmaps of a day
+        validators=[MaxValueValidator(63), MinValueValidator(0)],
+        help_text="Number of availability slots in a single day",
     )
     price_per_hour = models.DecimalField(
         null=False,
@@ -72,25 +80,32 @@ class DayDefinition(BaseModel):
     class Meta:
         verbose_name = "day definition"
         verbose_name_plural = "day definition"
+        indexes = [models.Index(fields=("boat", "from_date", "to_date"))]
 
 
 class Day(BaseModel):
+    boat = models.ForeignKey(Boat, related_name="days", on_delete=models.CASCADE)
     definition = models.ForeignKey(
         DayDefinition, related_name="days", on_delete=models.CASCADE
     )
     date = models.DateField()
+    slots_mask = models.BigIntegerField(
+        default=0, help_text="Bitmap of the positions of the slots of the day"
+    )
+    booked_mask = models.BigIntegerField(
+        default=0, help_text="Bitmap of the positions of the booked slots"
+    )
 
     def __str__(self) -> str:
         return str(self.date)
 
-    @property
-    def boat(self):
-        return self.definition.boat
-
     class Meta:
         verbose_name = "day"
         verbose_name_plural = "days"
         ordering = ("date",)
+        constraints = [
+            models.UniqueConstraint(fields=("boat", "date"), name="unique_boat_day")
+        ]
 
 
 class Slot(BaseModel):
@@ -100,6 +115,8 @@ class Slot(BaseModel):
     """
 
     day = models.ForeignKey(Day, related_name="slots", on_delete=models.CASCADE)
+    boat = models.ForeignKey(Boat, related_name="slots", on_delete=models.CASCADE)
+    date = models.DateField(help_text="Date of the day of the slot")
     position = models.IntegerField(help_text="Slot position into day")
     from_hour = models.TimeField(help_text="Time at which the slot starts")
     to_hour = models.TimeField(help_text="Time at which the slot ends")
@@ -107,17 +124,64 @@ class Slot(BaseModel):
 
     def __str__(self) -> str:
         slot_str = (
-            f"Slot {self.day} from {self.from_hour} to {self.to_hour} "
-            f"of {self.day.definition.boat}"
+            f"Slot {self.date} from {self.from_hour} to {self.to_hour} "
+            f"of {self.boat}"
         )
         if self.booked:
             return f"{slot_str} booked"
         return f"{slot_str} available"
 
+    def save(self, *args, **kwargs):
+        if self.day_id and (self.boat_id is None or self.date is None):
+            self.boat_id = self.day.boat_id
+            self.date = self.day.date
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = "slot"
         verbose_name_plural = "slots"
         ordering = ("position",)
+        indexes = [
+            # Covers the reads that rebuild days bitmaps and counters
+            models.Index(
+                fields=("day", "position"),
+                include=("booked",),
+                name="slot_day_position_idx",
+            ),
+            models.Index(fields=("boat", "date")),
+        ]
+
+
+class DayOccupancy(BaseModel):
+    """
+    Slot counters of a day. They are kept in sync with its slots so calendars
+    and occupancy reports don't need to scan the Slot table
+    """
+
+    day = models.OneToOneField(Day, related_name="occupancy", on_delete=models.CASCADE)
+    boat = models.ForeignKey(
+        Boat, related_name="days_occupancy", on_delete=models.CASCADE
+    )
+    date = models.DateField()
+    total_slots = models.IntegerField(default=0)
+    booked_slots = models.IntegerField(default=0)
+    availability_type = models.CharField(
+        choices=DayAvailabilityTypes.LIST,
+        default=DayAvailabilityTypes.FREE,
+        max_length=20,
+    )
+
+    def __str__(self) -> str:
+        return (
+            f"{self.booked_slots} of {self.total_slots} slots booked "
+            f"on {self.date} for {self.boat}"
+        )
+
+    class Meta:
+        verbose_name = "day occupancy"
+        verbose_name_plural = "days occupancy"
+        ordering = ("date",)
+        indexes = [models.Index(fields=("boat", "date"))]
 
 
 class PriceVariation(BaseModel):
@@ -145,3 +209,40 @@ class PriceVariation(BaseModel):
     class Meta:
         verbose_name = "price variation"
         verbose_name_plural = "price variations"
+        indexes = [models.Index(fields=("boat", "from_date", "to_date"))]
+
+
+class AvailabilityJob(BaseModel):
+    """
+    Availability generation or deletion of a year for some boats, run in
+    background by the run_availability_jobs command
+    """
+
+    action = models.CharField(choices=AvailabilityJobActions.LIST, max_length=20)
+    boats = models.ManyToManyField(Boat, related_name="availability_jobs")
+    year = models.IntegerField()
+    force = models.BooleanField(
+        default=False,
+        help_text="Delete availability even if there are confirmed bookings",
+    )
+    status = models.CharField(
+        choices=AvailabilityJobStatus.LIST,
+        default=AvailabilityJobStatus.PENDING,
+        max_length=20,
+    )
+    n_boats = models.IntegerField(default=0, help_text="Number of boats to process")
+    n_processed_boats = models.IntegerField(
+        default=0, help_text="Number of boats already processed"
+    )
+    messages = models.TextField(blank=True, default="")
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.get_action_display()} availability of {self.year}"
+
+    class Meta:
+        verbose_name = "availability job"
+        verbose_name_plural = "availability jobs"
+        ordering = ("-created",)
+        indexes = [models.Index(fields=("status", "created"))]
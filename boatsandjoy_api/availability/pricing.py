@@ -0,0 +1,91 @@
+"""
+Prices are computed in integer cents from the exact value of every amount and
+factor involved, rounding half to even just where the price is settled
+"""
+from decimal import Decimal
+from fractions import Fraction
+from functools import lru_cache
+from typing import List, Optional, Union
+
+from . import domain
+
+Amount = Union[Decimal, float, int]
+
+
+def to_cents(amount: Amount) -> Fraction:
+    return Fraction(amount) * 100
+
+
+def round_cents(cents: Fraction) -> int:
+    return round(cents)
+
+
+def from_cents(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+def quantize(amount: Amount) -> Decimal:
+    return from_cents(round_cents(to_cents(amount)))
+
+
+def apply_discount(amount: Amount, discount: Amount) -> Decimal:
+    return from_cents(round_cents(to_cents(amount) * (1 - Fraction(discount))))
+
+
+def get_price_table(
+    day_definition: domain.DayDefinition,
+    price_variations: List[domain.PriceVariation],
+    max_length: int = None,
+) -> domain.PriceTable:
+    """
+    Final prices of a boat in a day indexed by combination length
+    """
+    return _build_price_table(
+        day_definition.price_per_hour,
+        _get_factor(price_variations),
+        day_definition.hours_per_slot,
+        max(day_definition.n_slots, max_length or 0),
+        day_definition.n_slots_deal_threshold,
+        day_definition.discount_when_deal,
+        day_definition.resident_discount,
+    )
+
+
+def _get_factor(price_variations: List[domain.PriceVariation]) -> Optional[float]:
+    if price_variations:
+        return price_variations[0].factor or None
+    return None
+
+
+def _get_price_per_hour_cents(price_per_hour: Amount, factor: Optional[float]) -> int:
+    cents = to_cents(price_per_hour)
+    if factor:
+        cents *= Fraction(factor)
+    return round_cents(cents)
+
+
+@lru_cache(maxsize=256)
+def _build_price_table(
+    price_per_hour: Decimal,
+    factor: Optional[float],
+    hours_per_slot: int,
+    max_length: int,
+    n_slots_deal_threshold: int,
+    discount_when_deal: float,
+    resident_discount: float,
+) -> domain.PriceTable:
+    price_per_hour_cents = _get_price_per_hour_cents(price_per_hour, factor)
+    deal_factor = 1 - Fraction(discount_when_deal)
+    resident_factor = 1 - Fraction(resident_discount)
+    prices, resident_prices = [], []
+    for length in range(max_length + 1):
+        cents = Fraction(length * hours_per_slot * price_per_hour_cents)
+        if length >= n_slots_deal_threshold and discount_when_deal:
+            cents *= deal_factor
+        prices.append(from_cents(round_cents(cents)))
+        resident_prices.append(from_cents(round_cents(cents * resident_factor)))
+    return domain.PriceTable(
+        price_per_hour=from_cents(price_per_hour_cents),
+        prices=tuple(prices),
+        resident_prices=tuple(resident_prices),
+    )
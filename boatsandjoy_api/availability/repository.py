@@ -1,12 +1,18 @@
 from abc import ABC, abstractmethod
-from datetime import date, datetime, timedelta
-from decimal import Decimal
-from typing import List
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Optional
 
-from boatsandjoy_api.boats.domain import Boat
+from django.db import transaction
+from django.utils import timezone
+
+from boatsandjoy_api.bookings.constants import BookingStatus
 from boatsandjoy_api.core.data_adapters import DjangoDataAdapter
 from . import domain, models
-from .exceptions import NoAvailabilityForDay, NoDayDefinitionDefined
+from .cache import DjangoAvailabilityCache
+from .exceptions import AvailabilityWithConfirmedBookings
+from .indexes import AvailabilityIndexes
+from .utils import iter_dates_date_ranges
 
 
 class AvailabilityRepository(ABC):
@@ -19,80 +25,76 @@ class AvailabilityRepository(ABC):
 
     @classmethod
     @abstractmethod
-    def get_day_definition(
-        cls, obj_id: int = None, boat_id: int = None, date_: date = None
-    ) -> domain.DayDefinition:
+    def create_availability(
+        cls,
+        day_definitions: List[domain.DayDefinition],
+        from_: date,
+        to: date,
+        chunk_size: int = 1000,
+    ) -> domain.GeneratedAvailability:
         pass
 
     @classmethod
     @abstractmethod
-    def create_days(
-        cls, day_definitions: List[domain.DayDefinition], from_: date, to: date
-    ) -> List[domain.Day]:
+    def filter_price_variations(
+        cls, obj_id: int = None, boat_id: int = None, date_: date = None
+    ) -> List[domain.PriceVariation]:
         pass
 
     @classmethod
     @abstractmethod
-    def create_slots(cls, day: domain.Day) -> List[domain.Slot]:
+    def delete_availability(
+        cls,
+        boat_id: int,
+        year: int = None,
+        from_: date = None,
+        to: date = None,
+        force: bool = False,
+        chunk_size: int = 500,
+    ) -> domain.DeletedAvailability:
         pass
 
     @classmethod
     @abstractmethod
-    def filter_price_variations(
-        cls, obj_id: int = None, boat_id: int = None, date_: date = None
-    ) -> List[domain.PriceVariation]:
+    def filter_boats_days(
+        cls, boat_ids: List[int], date_: date
+    ) -> Dict[int, domain.BoatDay]:
         pass
 
     @classmethod
     @abstractmethod
-    def delete_days(cls, days: List[domain.Day]):
+    def filter_days_occupancy(
+        cls, boat_ids: List[int], from_: date, to: date
+    ) -> List[domain.DayOccupancy]:
         pass
 
     @classmethod
     @abstractmethod
-    def get_day(cls, boat: Boat, date_: date) -> domain.Day:
+    def refresh_days_occupancy(cls, day_ids: List[int], dry_run: bool = False) -> int:
         pass
 
-    @classmethod
-    def get_slot_timing(
-        cls, day_definition: domain.DayDefinition, slot: domain.Slot
-    ) -> domain.SlotTiming:
-        hours_per_slot = day_definition.hours_per_slot
-        delta = timedelta(hours=hours_per_slot * slot.position)
-        from_hour = (
-            datetime.combine(date(1, 1, 1), day_definition.first_time) + delta
-        ).time()
-        delta2 = timedelta(hours=day_definition.hours_per_slot)
-        to_hour = (datetime.combine(date(1, 1, 1), from_hour) + delta2).time()
-        return domain.SlotTiming(from_hour=from_hour, to_hour=to_hour)
-
     @classmethod
     def get_available_slots(cls, day: domain.Day) -> List[domain.Slot]:
-        return list(filter(lambda slot: not slot.booked, day.slots))
+        free_mask = day.free_mask
+        return [slot for slot in day.slots if free_mask >> slot.position & 1]
 
     @classmethod
     def sort_slots(cls, slots: List[domain.Slot]) -> List[domain.Slot]:
         return sorted(slots, key=lambda slot: slot.position)
 
-    @classmethod
-    def get_price_per_hour(cls, boat: Boat, date_: date) -> Decimal:
-        day_definition = cls.get_day_definition(boat_id=boat.id, date_=date_)
-        price_variations = cls.filter_price_variations(boat_id=boat.id, date_=date_)
-        price = day_definition.price_per_hour
-        if price_variations:
-            price_variation = price_variations[0]
-            if price_variation.factor:
-                price = day_definition.price_per_hour * Decimal(price_variation.factor)
-        return round(price, 2)
-
 
 class DjangoAvailabilityRepository(AvailabilityRepository):
     DATA_ADAPTER = DjangoDataAdapter
+    CACHE = DjangoAvailabilityCache
+    _indexes: Optional[AvailabilityIndexes] = None
 
     @classmethod
     def filter_days_definitions(
         cls, obj_id: int = None, boat_id: int = None, date_: date = None
     ) -> List[domain.DayDefinition]:
+        if obj_id is None and boat_id is not None and date_ is not None:
+            return cls.get_indexes().find_day_definitions(boat_id, date_)
+
         django_filters = cls.DATA_ADAPTER.transform(
             id=obj_id, boat_id=boat_id, from_date__lte=date_, to_date__gte=date_
         )
@@ -103,51 +105,105 @@ class DjangoAvailabilityRepository(AvailabilityRepository):
         ]
 
     @classmethod
-    def get_day_definition(
-        cls, obj_id: int = None, boat_id: int = None, date_: date = None
-    ) -> domain.DayDefinition:
-        django_filters = cls.DATA_ADAPTER.transform(
-            id=obj_id, boat_id=boat_id, from_date__lte=date_, to_date__gte=date_
+    def create_availability(
+        cls,
+        day_definitions: List[domain.DayDefinition],
+        from_: date,
+        to: date,
+        chunk_size: int = 1000,
+    ) -> domain.GeneratedAvailability:
+        """
+        Creates, in a single transaction, the days between both dates (both
+        included) that the boats of the definitions don't have yet, with
+        their slots and occupancy. Each day takes the first definition of its
+        boat that covers it
+        """
+        day_definitions_by_boat = defaultdict(list)
+        for day_definition in day_definitions:
+            day_definitions_by_boat[day_definition.boat_id].append(day_definition)
+        day_definitions_by_id = {
+            day_definition.id: day_definition for day_definition in day_definitions
+        }
+        boat_days = models.Day.objects.filter(
+            boat_id__in=day_definitions_by_boat, date__gte=from_, date__lte=to
         )
-        try:
-            day_definition = models.DayDefinition.objects.get(**django_filters)
-        except models.DayDefinition.DoesNotExist:
-            raise NoDayDefinitionDefined(
-                f"This boat has not a day definition for day {date_}"
-            )
-        return cls.get_day_definition_domain_object(day_definition)
-
-    @classmethod
-    def create_days(
-        cls, day_definitions: List[domain.DayDefinition], from_: date, to: date
-    ) -> List[domain.Day]:
-        days = []
-        for i in range(int((to - from_).days)):
-            date_ = from_ + timedelta(days=i)
-            for day_definition in day_definitions:
-                if day_definition.from_date <= date_ <= day_definition.to_date:
-                    days.append(models.Day(definition_id=day_definition.id, date=date_))
-                    break
-        days = models.Day.objects.bulk_create(days)
-        return [cls.get_day_domain_object(day) for day in days]
-
-    @classmethod
-    def create_slots(cls, day: domain.Day) -> List[domain.Slot]:
-        day_definition = cls.get_day_definition(obj_id=day.day_definition_id)
-        slots = []
-        for i in range(day_definition.n_slots):
-            slot = models.Slot(day_id=day.id, position=i)
-            slot_timing = cls.get_slot_timing(day_definition, slot)
-            slot.from_hour = slot_timing.from_hour
-            slot.to_hour = slot_timing.to_hour
-            slots.append(slot)
-        slots = models.Slot.objects.bulk_create(slots)
-        return [cls.get_slot_domain_object(slot) for slot in slots]
+
+        with transaction.atomic():
+            existing_days = set(boat_days.values_list("boat_id", "date"))
+            days = []
+            for boat_id, boat_day_definitions in day_definitions_by_boat.items():
+                for date_, day_definition in iter_dates_date_ranges(
+                    boat_day_definitions, from_, to
+                ):
+                    if (boat_id, date_) in existing_days:
+                        continue
+                    days.append(
+                        models.Day(
+                            boat_id=boat_id,
+                            definition_id=day_definition.id,
+                            date=date_,
+                            slots_mask=(1 << day_definition.n_slots) - 1,
+                        )
+                    )
+            models.Day.objects.bulk_create(days, batch_size=chunk_size)
+
+            # Not every database returns the ids of bulk created rows
+            created_days = [
+                day
+                for day in boat_days.values_list(
+                    "id", "boat_id", "date", "definition_id"
+                )
+                if day[1:3] not in existing_days
+            ]
+            n_slots = 0
+            for i in range(0, len(created_days), chunk_size):
+                slots, days_occupancy = [], []
+                for day_id, boat_id, date_, day_definition_id in created_days[
+                    i : i + chunk_size
+                ]:
+                    slot_timings = day_definitions_by_id[day_definition_id].slot_timings
+                    slots.extend(
+                        models.Slot(
+                            day_id=day_id,
+                            boat_id=boat_id,
+                            date=date_,
+                            position=position,
+                            from_hour=slot_timing.from_hour,
+                            to_hour=slot_timing.to_hour,
+                        )
+                        for position, slot_timing in enumerate(slot_timings)
+                    )
+                    occupancy = domain.DayOccupancy(
+                        boat_id=boat_id,
+                        date=date_,
+                        total_slots=len(slot_timings),
+                        booked_slots=0,
+                    )
+                    days_occupancy.append(
+                        models.DayOccupancy(
+                            day_id=day_id,
+                            boat_id=boat_id,
+                            date=date_,
+                            total_slots=occupancy.total_slots,
+                            booked_slots=occupancy.booked_slots,
+                            availability_type=occupancy.availability_type,
+                        )
+                    )
+                models.Slot.objects.bulk_create(slots, batch_size=chunk_size)
+                models.DayOccupancy.objects.bulk_create(
+                    days_occupancy, batch_size=chunk_size
+                )
+                n_slots += len(slots)
+
+        return domain.GeneratedAvailability(n_days=len(created_days), n_slots=n_slots)
 
     @classmethod
     def filter_price_variations(
         cls, obj_id: int = None, boat_id: int = None, date_: date = None
     ) -> List[domain.PriceVariation]:
+        if obj_id is None and boat_id is not None and date_ is not None:
+            return cls.get_indexes().find_price_variations(boat_id, date_)
+
         django_filters = cls.DATA_ADAPTER.transform(
             id=obj_id, boat_id=boat_id, from_date__lte=date_, to_date__gte=date_
         )
@@ -158,22 +214,236 @@ class DjangoAvailabilityRepository(AvailabilityRepository):
         ]
 
     @classmethod
-    def delete_days(cls, days: List[domain.Day]):
-        day_ids = [day.id for day in days]
-        models.Day.objects.filter(id__in=day_ids).delete()
+    def delete_availability(
+        cls,
+        boat_id: int,
+        year: int = None,
+        from_: date = None,
+        to: date = None,
+        force: bool = False,
+        chunk_size: int = 500,
+    ) -> domain.DeletedAvailability:
+        """
+        Deletes the days of a boat in a year or between two dates (both
+        included), with their slots, in chunks inside a single transaction.
+        Days with slots of confirmed bookings are only deleted when forced.
+        Days and slots have no delete receivers, so they are deleted without
+        being loaded, and the cached availability of their dates is
+        invalidated here
+        """
+        django_filters = cls.DATA_ADAPTER.transform(
+            boat_id=boat_id, date__year=year, date__gte=from_, date__lte=to
+        )
+        days = models.Day.objects.filter(**django_filters)
+        n_days = n_slots = 0
+        with transaction.atomic():
+            if not force:
+                n_confirmed_bookings = (
+                    models.Slot.objects.filter(
+                        day__in=days, booking__status=BookingStatus.CONFIRMED
+                    )
+                    .values("booking")
+                    .distinct()
+                    .count()
+                )
+                if n_confirmed_bookings:
+                    raise AvailabilityWithConfirmedBookings(
+                        f"There are {n_confirmed_bookings} confirmed bookings "
+                        f"for these days"
+                    )
+            days = list(days.values_list("id", "date"))
+            for i in range(0, len(days), chunk_size):
+                day_ids, dates = zip(*days[i : i + chunk_size])
+                _, n_deleted = models.Day.objects.filter(id__in=day_ids).delete()
+                n_days += n_deleted.get(models.Day._meta.label, 0)
+                n_slots += n_deleted.get(models.Slot._meta.label, 0)
+                cls.CACHE.invalidate_dates(dates)
+        return domain.DeletedAvailability(n_days=n_days, n_slots=n_slots)
 
     @classmethod
-    def get_day(cls, boat: Boat, date_: date) -> domain.Day:
-        django_filters = cls.DATA_ADAPTER.transform(
-            definition__boat_id=boat.id, date=date_
+    def filter_boats_days(
+        cls, boat_ids: List[int], date_: date
+    ) -> Dict[int, domain.BoatDay]:
+        """
+        Loads everything needed to build the availability of several boats
+        for a single date with a fixed number of queries. Boats without a day
+        or without a day definition for that date are not included. Days take
+        the definition they were generated from, or like generation does, the
+        first one covering their date if it doesn't cover it anymore
+        """
+        days = models.Day.objects.filter(
+            boat_id__in=boat_ids, date=date_
+        ).prefetch_related("slots")
+        days_by_boat = {day.boat_id: day for day in days}
+        indexes = cls.get_indexes()
+
+        boats_days = {}
+        for boat_id in boat_ids:
+            day_definitions = indexes.find_day_definitions(boat_id, date_)
+            if boat_id not in days_by_boat or not day_definitions:
+                continue
+            day = cls.get_day_domain_object(days_by_boat[boat_id])
+            day_definition = next(
+                (
+                    day_definition
+                    for day_definition in day_definitions
+                    if day_definition.id == day.day_definition_id
+                ),
+                day_definitions[0],
+            )
+            boats_days[boat_id] = domain.BoatDay(
+                boat_id=boat_id,
+                day=day,
+                day_definition=day_definition,
+                price_variations=indexes.find_price_variations(boat_id, date_),
+            )
+        return boats_days
+
+    @classmethod
+    def filter_days_occupancy(
+        cls, boat_ids: List[int], from_: date, to: date
+    ) -> List[domain.DayOccupancy]:
+        days_occupancy = models.DayOccupancy.objects.filter(
+            boat_id__in=boat_ids, date__gte=from_, date__lte=to
+        ).values_list("boat_id", "date", "total_slots", "booked_slots")
+        return [
+            domain.DayOccupancy(
+                boat_id=boat_id,
+                date=date_,
+                total_slots=total_slots,
+                booked_slots=booked_slots,
+            )
+            for boat_id, date_, total_slots, booked_slots in days_occupancy
+        ]
+
+    @classmethod
+    @transaction.atomic
+    def refresh_days_occupancy(cls, day_ids: List[int], dry_run: bool = False) -> int:
+        """
+        Recomputes the slot bitmaps and the occupancy counters of the given days
+        from their slots. Meant to be called inside the transaction that changes
+        the slots. The days are locked before their slots are read, so
+        concurrent refreshes of the same day don't overwrite each other, and
+        the cached availability of the days rebuilt is invalidated on commit
+
+        :return: number of days whose bitmaps or counters were (or with dry_run
+        would be) out of sync
+        """
+        days = list(
+            models.Day.objects.select_for_update().filter(id__in=day_ids).order_by("id")
+        )
+        slots_masks = defaultdict(int)
+        booked_masks = defaultdict(int)
+        slots = models.Slot.objects.filter(day_id__in=day_ids).values_list(
+            "day_id", "position", "booked"
         )
-        try:
-            day = models.Day.objects.get(**django_filters)
-        except models.Day.DoesNotExist:
-            raise NoAvailabilityForDay(
-                "There are not day availability definied for this day"
+        for day_id, position, booked in slots:
+            slots_masks[day_id] |= 1 << position
+            if booked:
+                booked_masks[day_id] |= 1 << position
+        # Counters are rebuilt under the days lock too, and their rows are
+        # locked in case anything else writes them
+        days_occupancy = {
+            day_occupancy.day_id: day_occupancy
+            for day_occupancy in models.DayOccupancy.objects.select_for_update()
+            .filter(day_id__in=day_ids)
+            .order_by("day_id")
+        }
+        days_to_update, to_create, to_update = [], [], []
+        for day in days:
+            slots_mask = slots_masks[day.id]
+            booked_mask = booked_masks[day.id]
+            if day.slots_mask != slots_mask or day.booked_mask != booked_mask:
+                day.slots_mask = slots_mask
+                day.booked_mask = booked_mask
+                day.modified = timezone.now()
+                days_to_update.append(day)
+
+            occupancy = domain.DayOccupancy(
+                boat_id=day.boat_id,
+                date=day.date,
+                total_slots=slots_mask.bit_count(),
+                booked_slots=booked_mask.bit_count(),
+            )
+            day_occupancy = days_occupancy.get(day.id)
+            if day_occupancy is None:
+                to_create.append(
+                    models.DayOccupancy(
+                        day_id=day.id,
+                        boat_id=occupancy.boat_id,
+                        date=occupancy.date,
+                        total_slots=occupancy.total_slots,
+                        booked_slots=occupancy.booked_slots,
+                        availability_type=occupancy.availability_type,
+                    )
+                )
+            elif (
+                day_occupancy.boat_id != occupancy.boat_id
+                or day_occupancy.total_slots != occupancy.total_slots
+                or day_occupancy.booked_slots != occupancy.booked_slots
+                or day_occupancy.availability_type != occupancy.availability_type
+            ):
+                day_occupancy.boat_id = occupancy.boat_id
+                day_occupancy.total_slots = occupancy.total_slots
+                day_occupancy.booked_slots = occupancy.booked_slots
+                day_occupancy.availability_type = occupancy.availability_type
+                day_occupancy.modified = timezone.now()
+                to_update.append(day_occupancy)
+
+        if not dry_run:
+            models.Day.objects.bulk_update(
+                days_to_update, ["slots_mask", "booked_mask", "modified"]
+            )
+            models.DayOccupancy.objects.bulk_create(to_create)
+            models.DayOccupancy.objects.bulk_update(
+                to_update,
+                [
+                    "boat",
+                    "total_slots",
+                    "booked_slots",
+                    "availability_type",
+                    "modified",
+                ],
+            )
+        out_of_sync_day_ids = {day.id for day in days_to_update}
+        out_of_sync_day_ids.update(
+            day_occupancy.day_id for day_occupancy in to_create + to_update
+        )
+        if not dry_run:
+            cls.CACHE.invalidate_dates(
+                day.date for day in days if day.id in out_of_sync_day_ids
+            )
+        return len(out_of_sync_day_ids)
+
+    @classmethod
+    def get_indexes(cls) -> AvailabilityIndexes:
+        """
+        Day definitions and price variations are loaded once per process and
+        reloaded when the global availability version changes, which is read
+        once per request, see LocalVersion
+        """
+        version = cls.CACHE.get_global_version()
+        indexes = DjangoAvailabilityRepository._indexes
+        if indexes is None or indexes.version != version:
+            indexes = AvailabilityIndexes(
+                version=version,
+                day_definitions=(
+                    (
+                        day_definition.id,
+                        cls.get_day_definition_domain_object(day_definition),
+                    )
+                    for day_definition in models.DayDefinition.objects.all()
+                ),
+                price_variations=(
+                    (
+                        price_variation.id,
+                        cls.get_price_variation_domain_object(price_variation),
+                    )
+                    for price_variation in models.PriceVariation.objects.all()
+                ),
             )
-        return cls.get_day_domain_object(day)
+            DjangoAvailabilityRepository._indexes = indexes
+        return indexes
 
     @classmethod
     def get_day_definition_domain_object(
@@ -187,8 +457,7 @@ class DjangoAvailabilityRepository(AvailabilityRepository):
             price_per_hour=day_definition.price_per_hour,
             from_date=day_definition.from_date,
             to_date=day_definition.to_date,
-            boat_id=day_definition.boat.id,
-            days=[cls.get_day_domain_object(day) for day in day_definition.days.all()],
+            boat_id=day_definition.boat_id,
             n_slots_deal_threshold=day_definition.n_slots_deal_threshold,
             discount_when_deal=day_definition.discount_when_deal,
             resident_discount=day_definition.resident_discount,
@@ -199,8 +468,10 @@ class DjangoAvailabilityRepository(AvailabilityRepository):
         return domain.Day(
             id=day.id,
             date=day.date,
-            day_definition_id=day.definition.id,
+            day_definition_id=day.definition_id,
             slots=[cls.get_slot_domain_object(slot) for slot in day.slots.all()],
+            slots_mask=day.slots_mask,
+            booked_mask=day.booked_mask,
         )
 
     @classmethod
@@ -211,7 +482,7 @@ class DjangoAvailabilityRepository(AvailabilityRepository):
             from_hour=slot.from_hour,
             to_hour=slot.to_hour,
             booked=slot.booked,
-            day_id=slot.day.id,
+            day_id=slot.day_id,
         )
 
     @classmethod
@@ -222,5 +493,5 @@ class DjangoAvailabilityRepository(AvailabilityRepository):
             from_date=price_variation.from_date,
             to_date=price_variation.to_date,
             factor=price_variation.factor,
-            boat_id=price_variation.boat.id,
+            boat_id=price_variation.boat_id,
         )
@@ -1,14 +1,23 @@
 from dataclasses import dataclass
 from datetime import date
 
+from .constants import AvailabilityResponseFormats
+
 
 @dataclass
 class GetDayAvailabilityRequest:
     date: date
     apply_resident_discount: bool
+    response_format: str = AvailabilityResponseFormats.VERBOSE
 
 
 @dataclass
 class GetMonthAvailabilityRequest:
     month: int
     year: int
+
+
+@dataclass
+class GetRangeAvailabilityRequest:
+    from_date: date
+    to_date: date
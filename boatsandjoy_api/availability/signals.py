@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from boatsandjoy_api.boats.models import Boat
+from boatsandjoy_api.bookings.models import Booking
+from .cache import DjangoAvailabilityCache
+from .models import DayDefinition, PriceVariation, Slot
+
+
+@receiver(post_save, sender=Slot)
+def invalidate_slot_date(sender, instance: Slot, **kwargs):
+    DjangoAvailabilityCache.invalidate_dates([instance.date])
+
+
+@receiver(post_save, sender=Booking)
+def invalidate_booking_dates(sender, instance: Booking, created: bool, **kwargs):
+    if created:
+        return
+    dates = instance.slots.values_list("date", flat=True)
+    DjangoAvailabilityCache.invalidate_dates(dates)
+
+
+@receiver(post_save, sender=Boat)
+@receiver(post_delete, sender=Boat)
+@receiver(post_save, sender=DayDefinition)
+@receiver(post_delete, sender=DayDefinition)
+@receiver(post_save, sender=PriceVariation)
+@receiver(post_delete, sender=PriceVariation)
+def invalidate_all(sender, **kwargs):
+    DjangoAvailabilityCache.invalidate_all()
@@ -0,0 +1,918 @@
+import random
+from datetime import date, timedelta
+from functools import partial
+from io import StringIO
+from decimal import Decimal
+from typing import List, Optional
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models.signals import post_delete, pre_delete
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from boatsandjoy_api.boats.models import Boat
+from boatsandjoy_api.boats.repository import DjangoBoatsRepository
+from boatsandjoy_api.bookings.admin import confirm_booking, unconfirm_booking
+from boatsandjoy_api.bookings.api import BookingsApi
+from boatsandjoy_api.bookings.models import Booking, Promocode
+from boatsandjoy_api.bookings.payment_gateways import PaymentGateway
+from boatsandjoy_api.bookings.repository import DjangoBookingsRepository
+from boatsandjoy_api.bookings.requests import CreateBookingRequest
+from boatsandjoy_api.core.cache import forget_local_versions
+from boatsandjoy_api.core.responses import ErrorResponseBuilder, ResponseBuilder
+from . import domain, models, pricing
+from .api import AvailabilityApi, api as availability_api
+from .availability_generators import AvailabilityGenerator
+from .cache import DjangoAvailabilityCache
+from .combinations import iter_mask_combinations, iter_mask_runs, positions_to_mask
+from .constants import (
+    AvailabilityJobActions,
+    AvailabilityJobStatus,
+    AvailabilityResponseFormats,
+    DayAvailabilityTypes,
+)
+from .exceptions import AvailabilityWithConfirmedBookings
+from .jobs import claim_job, enqueue_job, requeue_stalled_jobs
+from .domain import DateRange
+from .repository import DjangoAvailabilityRepository
+from .requests import (
+    GetDayAvailabilityRequest,
+    GetMonthAvailabilityRequest,
+    GetRangeAvailabilityRequest,
+)
+from .utils import (
+    date_ranges_collision,
+    find_date_ranges_collisions,
+    get_minutes,
+    iter_dates_date_ranges,
+)
+
+
+def get_legacy_price(
+    day_definition: domain.DayDefinition,
+    price_variations: List[domain.PriceVariation],
+    n_slots: int,
+    apply_resident_discount: bool,
+) -> Decimal:
+    """
+    Former availability pricing (price per hour, combination price and
+    discounts), kept as reference
+    """
+    price_per_hour = day_definition.price_per_hour
+    if price_variations and price_variations[0].factor:
+        price_per_hour = day_definition.price_per_hour * Decimal(
+            price_variations[0].factor
+        )
+    price_per_hour = round(price_per_hour, 2)
+    theoretical_price = n_slots * day_definition.hours_per_slot * price_per_hour
+    price = theoretical_price
+    if (
+        n_slots >= day_definition.n_slots_deal_threshold
+        and day_definition.discount_when_deal
+    ):
+        price = theoretical_price - theoretical_price * Decimal(
+            day_definition.discount_when_deal
+        )
+    if apply_resident_discount:
+        price = price - price * Decimal(day_definition.resident_discount)
+    return round(price, 2)
+
+
+def get_legacy_booking_price(price: Decimal, discount: Decimal) -> Decimal:
+    """
+    Former booking discount, rounded as the price field stores it
+    """
+    return round(price - price * discount, 2)
+
+
+def create_boat_with_availability(
+    name: str, from_date: date, to_date: date, n_slots: int = 8
+) -> Boat:
+    boat = Boat.objects.create(name=name)
+    day_definition = models.DayDefinition.objects.create(
+        boat=boat,
+        n_slots=n_slots,
+        hours_per_slot=1,
+        price_per_hour=Decimal(40),
+        from_date=from_date,
+        to_date=to_date,
+        n_slots_deal_threshold=4,
+        discount_when_deal=0.1,
+    )
+    models.PriceVariation.objects.create(
+        boat=boat, from_date=from_date, to_date=to_date, factor=1.2
+    )
+    DjangoAvailabilityRepository.create_availability(
+        [DjangoAvailabilityRepository.get_day_definition_domain_object(day_definition)],
+        from_=from_date,
+        to=to_date,
+    )
+    return boat
+
+
+def book_slots(boat: Boat, date_: date, positions: List[int] = None):
+    slots = models.Slot.objects.filter(boat=boat, date=date_)
+    if positions is not None:
+        slots = slots.filter(position__in=positions)
+    slots.update(booked=True)
+    DjangoAvailabilityRepository.refresh_days_occupancy(
+        list(
+            models.Day.objects.filter(boat=boat, date=date_).values_list(
+                "id", flat=True
+            )
+        )
+    )
+
+
+def reset_availability_caches():
+    """
+    Cached responses and versions outlive the transaction of each test
+    """
+    caches[settings.AVAILABILITY_CACHE].clear()
+    caches[settings.BOATS_CACHE].clear()
+    forget_local_versions()
+
+
+class TestPaymentGateway(PaymentGateway):
+    @classmethod
+    def generate_checkout_session_id(
+        cls, name: str, description: str, price: Decimal
+    ) -> str:
+        return "session"
+
+    @classmethod
+    def get_session_id_from_event(cls, event: dict) -> str:
+        return event["id"]
+
+    @classmethod
+    def get_customer_email_from_event(cls, event: dict) -> str:
+        return event["email"]
+
+
+class PricingTestCase(TestCase):
+    N_SAMPLES = 1000
+    BOOKING_DATES = (date(2022, 1, 15), date(2022, 7, 15))
+
+    @classmethod
+    def setUpTestData(cls):
+        boat = Boat.objects.create(name="Boat")
+        day_definition = models.DayDefinition.objects.create(
+            boat=boat,
+            n_slots=8,
+            hours_per_slot=1,
+            price_per_hour=Decimal("41.17"),
+            from_date=date(2022, 1, 1),
+            to_date=date(2022, 12, 31),
+            n_slots_deal_threshold=4,
+            discount_when_deal=0.15,
+        )
+        models.PriceVariation.objects.create(
+            boat=boat, from_date=date(2022, 7, 1), to_date=date(2022, 8, 31), factor=1.3
+        )
+        for booking_date in cls.BOOKING_DATES:
+            DjangoAvailabilityRepository.create_availability(
+                [
+                    DjangoAvailabilityRepository.get_day_definition_domain_object(
+                        day_definition
+                    )
+                ],
+                from_=booking_date,
+                to=booking_date,
+            )
+        Promocode.objects.create(
+            name="promocode",
+            use_from=date(2022, 1, 1),
+            use_to=date.max,
+            booking_from=date(2022, 1, 1),
+            booking_to=date(2022, 12, 31),
+            factor=0.1,
+        )
+
+    def setUp(self):
+        self.rand = random.Random(0)
+        reset_availability_caches()
+
+    def test_price_tables_match_legacy_prices_of_stored_definitions(self):
+        cases = [
+            (day_definition, price_variations)
+            for day_definition in DjangoAvailabilityRepository.filter_days_definitions()
+            for price_variations in self._get_stored_price_variations(day_definition)
+        ]
+        self.assertEqual(len(cases), 2)
+        self.assertEqual(self._get_price_mismatches(cases), [])
+
+    def test_price_tables_match_legacy_prices_of_random_definitions(self):
+        cases = [self._get_random_case() for _ in range(self.N_SAMPLES)]
+        self.assertEqual(self._get_price_mismatches(cases), [])
+
+    def test_booking_discounts_match_legacy_booking_prices(self):
+        mismatches = []
+        for _ in range(self.N_SAMPLES):
+            price = self._get_random_amount()
+            discount = Decimal(0)
+            if self.rand.random() < 0.5:
+                discount += Decimal(settings.RESIDENT_DISCOUNT)
+            if self.rand.random() < 0.5:
+                discount += Decimal(round(self.rand.uniform(0, 0.5), 2))
+            expected = get_legacy_booking_price(price, discount)
+            booking_price = pricing.apply_discount(price, discount)
+            if booking_price != expected:
+                mismatches.append((price, discount, booking_price, expected))
+        self.assertEqual(mismatches, [])
+
+    def test_booking_prices_match_legacy_prices_with_promocode(self):
+        bookings_api = BookingsApi(
+            DjangoBookingsRepository,
+            ResponseBuilder,
+            ErrorResponseBuilder,
+            TestPaymentGateway,
+        )
+        [day_definition] = DjangoAvailabilityRepository.filter_days_definitions()
+        mismatches = []
+        for booking_date in self.BOOKING_DATES:
+            price_variations = DjangoAvailabilityRepository.filter_price_variations(
+                boat_id=day_definition.boat_id, date_=booking_date
+            )
+            slot_ids = list(
+                models.Slot.objects.filter(date=booking_date)
+                .order_by("position")
+                .values_list("id", flat=True)
+            )
+            for n_slots in range(1, len(slot_ids) + 1):
+                for is_resident in (False, True):
+                    for promocode, discount in (("", 0), ("promocode", 0.1)):
+                        response = bookings_api.create(
+                            CreateBookingRequest(
+                                slot_ids=slot_ids[:n_slots],
+                                customer_name="Customer",
+                                customer_telephone_number="600000000",
+                                extras="",
+                                is_resident=is_resident,
+                                promocode=promocode,
+                            )
+                        )
+                        self.assertFalse(response["error"], response)
+                        expected = get_legacy_booking_price(
+                            get_legacy_price(
+                                day_definition, price_variations, n_slots, is_resident
+                            ),
+                            Decimal(discount),
+                        )
+                        price = response["data"]["price"]
+                        if price != expected:
+                            mismatches.append(
+                                (booking_date, n_slots, is_resident, promocode)
+                                + (price, expected)
+                            )
+        self.assertEqual(mismatches, [])
+
+    @staticmethod
+    def _get_price_mismatches(cases: list) -> list:
+        mismatches = []
+        for day_definition, price_variations in cases:
+            price_table = pricing.get_price_table(day_definition, price_variations)
+            for n_slots in range(1, day_definition.n_slots + 1):
+                for apply_resident_discount in (False, True):
+                    expected = get_legacy_price(
+                        day_definition,
+                        price_variations,
+                        n_slots,
+                        apply_resident_discount,
+                    )
+                    price = price_table.get_price(n_slots, apply_resident_discount)
+                    if price != expected:
+                        mismatches.append(
+                            (
+                                day_definition,
+                                price_variations,
+                                n_slots,
+                                apply_resident_discount,
+                                price,
+                                expected,
+                            )
+                        )
+        return mismatches
+
+    @staticmethod
+    def _get_stored_price_variations(
+        day_definition: domain.DayDefinition,
+    ) -> List[List[domain.PriceVariation]]:
+        price_variations = DjangoAvailabilityRepository.filter_price_variations(
+            boat_id=day_definition.boat_id
+        )
+        return [[]] + [[price_variation] for price_variation in price_variations]
+
+    def _get_random_case(self):
+        factor: Optional[float] = None
+        if self.rand.random() < 0.5:
+            factor = round(self.rand.uniform(0.5, 2), 2)
+        day_definition = domain.DayDefinition(
+            id=0,
+            first_time=None,
+            hours_per_slot=self.rand.randint(1, 4),
+            n_slots=self.rand.randint(1, 12),
+            price_per_hour=self._get_random_amount(),
+            from_date=date.min,
+            to_date=date.max,
+            boat_id=0,
+            n_slots_deal_threshold=self.rand.randint(0, 6),
+            discount_when_deal=round(
+                self.rand.choice([0, self.rand.uniform(0, 0.5)]), 2
+            ),
+            resident_discount=round(self.rand.uniform(0, 0.3), 2),
+        )
+        price_variations = []
+        if factor is not None:
+            price_variations.append(
+                domain.PriceVariation(
+                    from_date=date.min, to_date=date.max, factor=factor, boat_id=0
+                )
+            )
+        return day_definition, price_variations
+
+    def _get_random_amount(self) -> Decimal:
+        return Decimal(self.rand.randint(0, 100000)).scaleb(-2)
+
+
+class DayAvailabilityTestCase(TestCase):
+    DATE = date(date.today().year + 1, 7, 15)
+
+    def setUp(self):
+        reset_availability_caches()
+
+    def test_queries_dont_grow_with_the_fleet(self):
+        self._create_boats(1)
+        with CaptureQueriesContext(connection) as context:
+            self._get_day_availability(n_boats=1)
+        self.assertGreater(len(context), 0)
+
+        self._create_boats(5)
+        with self.assertNumQueries(len(context)):
+            self._get_day_availability(n_boats=6)
+
+    def _create_boats(self, n_boats: int):
+        # Active boats and indexes are reloaded once the changes commit
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(n_boats):
+                create_boat_with_availability("Boat", self.DATE, self.DATE)
+        # Loads them before counting queries
+        self._get_day_availability(n_boats=None)
+
+    def _get_day_availability(self, n_boats: Optional[int]):
+        caches[settings.AVAILABILITY_CACHE].clear()
+        for response_format, _ in AvailabilityResponseFormats.LIST:
+            response = availability_api.get_day_availability(
+                GetDayAvailabilityRequest(
+                    date=self.DATE,
+                    apply_resident_discount=False,
+                    response_format=response_format,
+                )
+            )
+            self.assertFalse(response["error"])
+            if n_boats is not None:
+                self.assertEqual(len(response["data"]), n_boats)
+
+
+class CompactDayAvailabilityTestCase(TestCase):
+    DATE = date(date.today().year + 1, 7, 15)
+
+    @classmethod
+    def setUpTestData(cls):
+        boat = create_boat_with_availability("Boat", cls.DATE, cls.DATE)
+        create_boat_with_availability("Other boat", cls.DATE, cls.DATE, n_slots=4)
+        book_slots(boat, cls.DATE, positions=[2, 5])
+
+    def setUp(self):
+        reset_availability_caches()
+
+    def test_compact_combinations_match_verbose_ones(self):
+        for apply_resident_discount in (False, True):
+            verbose = self._get_day_availability(
+                AvailabilityResponseFormats.VERBOSE, apply_resident_discount
+            )
+            compact = self._get_day_availability(
+                AvailabilityResponseFormats.COMPACT, apply_resident_discount
+            )
+            self.assertEqual(len(compact), 2)
+            self.assertEqual(
+                [self._expand(boat_response) for boat_response in compact],
+                [
+                    [
+                        (
+                            [slot["id"] for slot in combination["slots"]],
+                            combination["price"],
+                            get_minutes(combination["from_hour"]),
+                            get_minutes(combination["to_hour"]),
+                        )
+                        for combination in boat_response["availability"]
+                    ]
+                    for boat_response in verbose
+                ],
+            )
+
+    def test_unknown_response_format_is_an_error(self):
+        response = availability_api.get_day_availability(
+            GetDayAvailabilityRequest(
+                date=self.DATE, apply_resident_discount=False, response_format="xml"
+            )
+        )
+        self.assertTrue(response["error"])
+
+    def _get_day_availability(
+        self, response_format: str, apply_resident_discount: bool
+    ) -> list:
+        response = availability_api.get_day_availability(
+            GetDayAvailabilityRequest(
+                date=self.DATE,
+                apply_resident_discount=apply_resident_discount,
+                response_format=response_format,
+            )
+        )
+        self.assertFalse(response["error"])
+        return response["data"]
+
+    @staticmethod
+    def _expand(boat_response: dict) -> list:
+        slots = {slot["position"]: slot for slot in boat_response["slots"]}
+        combinations = []
+        for start, length, price in boat_response["availability"]:
+            combination = [slots[position] for position in range(start, start + length)]
+            combinations.append(
+                (
+                    [slot["id"] for slot in combination],
+                    price,
+                    combination[0]["from_minutes"],
+                    combination[-1]["to_minutes"],
+                )
+            )
+        return combinations
+
+
+class MonthAvailabilityTestCase(TestCase):
+    YEAR = date.today().year + 1
+
+    @classmethod
+    def setUpTestData(cls):
+        july = partial(date, cls.YEAR, 7)
+        boat = create_boat_with_availability("Boat", july(1), july(30))
+        other_boat = create_boat_with_availability("Other boat", july(1), july(15))
+        book_slots(boat, july(5))
+        book_slots(other_boat, july(5))
+        book_slots(boat, july(10))
+        book_slots(boat, july(25), positions=[0, 1])
+
+    def setUp(self):
+        reset_availability_caches()
+
+    def test_range_availability_folds_the_day_types_of_every_boat(self):
+        july = partial(date, self.YEAR, 7)
+        response = availability_api.get_range_availability(
+            GetRangeAvailabilityRequest(from_date=july(1), to_date=july(31))
+        )
+        self.assertFalse(response["error"])
+        day_availability_types = {
+            result["date"]: result["name"] for result in response["data"]
+        }
+        expected = {
+            july(1): DayAvailabilityTypes.FREE,
+            july(5): DayAvailabilityTypes.FULL,
+            july(10): DayAvailabilityTypes.PARTIALLY_FREE,
+            july(20): DayAvailabilityTypes.PARTIALLY_FREE,
+            july(25): DayAvailabilityTypes.PARTIALLY_FREE,
+            july(31): DayAvailabilityTypes.NO_AVAIL,
+        }
+        self.assertEqual(
+            {date_: day_availability_types[date_] for date_ in expected}, expected
+        )
+
+    def test_month_availability_disables_full_and_unavailable_days(self):
+        response = availability_api.get_month_availability(
+            GetMonthAvailabilityRequest(year=self.YEAR, month=7)
+        )
+        self.assertFalse(response["error"])
+        self.assertEqual(len(response["data"]), 31)
+        self.assertEqual(
+            [
+                result["date"]
+                for result in response["data"]
+                if not result["availability"]
+            ],
+            [date(self.YEAR, 7, 5), date(self.YEAR, 7, 31)],
+        )
+
+
+class DaysOccupancyTestCase(TestCase):
+    DATE = date(2022, 7, 15)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.boat = create_boat_with_availability("Boat", cls.DATE, cls.DATE)
+        cls.day = models.Day.objects.get(boat=cls.boat)
+
+    def test_generation_writes_the_counters(self):
+        self.assertEqual(self._get_occupancy(), (8, 0, DayAvailabilityTypes.FREE))
+
+    def test_booking_admin_actions_update_the_counters(self):
+        booking = DjangoBookingsRepository.create(
+            price=Decimal(80),
+            slot_ids=list(
+                self.day.slots.filter(position__lt=2).values_list("id", flat=True)
+            ),
+            customer_name="Customer",
+            customer_telephone_number="600000000",
+            session_id="session",
+            extras="",
+            promocode="",
+        )
+        bookings = Booking.objects.filter(id=booking.id)
+
+        confirm_booking(None, None, bookings)
+        self.assertEqual(
+            self._get_occupancy(), (8, 2, DayAvailabilityTypes.PARTIALLY_FREE)
+        )
+        unconfirm_booking(None, None, bookings)
+        self.assertEqual(self._get_occupancy(), (8, 0, DayAvailabilityTypes.FREE))
+
+    def test_rebuild_command_verifies_and_repairs_the_counters(self):
+        call_command("rebuild_days_occupancy", "--verify", stdout=StringIO())
+
+        # Queryset updates leave the counters out of sync
+        self.day.slots.update(booked=True)
+        with self.assertRaises(CommandError):
+            call_command("rebuild_days_occupancy", "--verify", stdout=StringIO())
+        self.assertEqual(self._get_occupancy(), (8, 0, DayAvailabilityTypes.FREE))
+
+        call_command("rebuild_days_occupancy", stdout=StringIO())
+        self.assertEqual(self._get_occupancy(), (8, 8, DayAvailabilityTypes.FULL))
+        call_command("rebuild_days_occupancy", "--verify", stdout=StringIO())
+
+    def _get_occupancy(self) -> tuple:
+        day_occupancy = models.DayOccupancy.objects.get(day=self.day)
+        return (
+            day_occupancy.total_slots,
+            day_occupancy.booked_slots,
+            day_occupancy.availability_type,
+        )
+
+
+class ConditionalAvailabilityTestCase(TestCase):
+    DATE = date(date.today().year + 1, 7, 15)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.boat = create_boat_with_availability("Boat", cls.DATE, cls.DATE)
+
+    def setUp(self):
+        reset_availability_caches()
+
+    def test_day_availability_is_not_modified_until_its_slots_change(self):
+        url = reverse(
+            "availability:get-day-availability",
+            kwargs={"date_": self.DATE.isoformat()},
+        )
+        self._assert_not_modified_until_slots_change(url, "_build_day_availability")
+
+        etag = self.client.get(url)["ETag"]
+        self.assertNotEqual(
+            self.client.get(url, {"apply_resident_discount": 1})["ETag"], etag
+        )
+        self.assertNotEqual(
+            self.client.get(url, {"response_format": "compact"})["ETag"], etag
+        )
+
+    def test_month_availability_is_not_modified_until_its_slots_change(self):
+        url = reverse(
+            "availability:get-month-availability",
+            kwargs={"date_": self.DATE.replace(day=1).isoformat()},
+        )
+        self._assert_not_modified_until_slots_change(url, "_build_month_availability")
+
+    def _assert_not_modified_until_slots_change(self, url: str, build: str):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        with mock.patch.object(AvailabilityApi, build) as build_availability:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        build_availability.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            book_slots(self.boat, self.DATE, positions=[0])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class AvailabilityGenerationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.boat = Boat.objects.create(name="Boat")
+        models.DayDefinition.objects.create(
+            boat=cls.boat,
+            n_slots=8,
+            hours_per_slot=1,
+            price_per_hour=Decimal(40),
+            from_date=date(2022, 1, 1),
+            to_date=date(2022, 6, 30),
+        )
+
+    def test_generate_includes_both_ends_of_the_definitions(self):
+        models.DayDefinition.objects.create(
+            boat=self.boat,
+            n_slots=4,
+            hours_per_slot=2,
+            price_per_hour=Decimal(40),
+            from_date=date(2022, 7, 1),
+            to_date=date(2022, 12, 31),
+        )
+        generated_availability = self._get_generator().generate(2022)
+
+        self.assertEqual(generated_availability.n_days, 365)
+        self.assertEqual(generated_availability.n_slots, 181 * 8 + 184 * 4)
+        days = models.Day.objects.filter(boat=self.boat)
+        self.assertEqual(days.first().date, date(2022, 1, 1))
+        self.assertEqual(days.last().date, date(2022, 12, 31))
+        self.assertEqual(days.last().slots.count(), 4)
+
+    def test_generate_again_only_creates_the_missing_days(self):
+        self._get_generator().generate(2022)
+        generated_availability = self._get_generator().generate(2022)
+        self.assertEqual(generated_availability.n_days, 0)
+        self.assertEqual(generated_availability.n_slots, 0)
+
+        models.DayDefinition.objects.create(
+            boat=self.boat,
+            n_slots=4,
+            hours_per_slot=2,
+            price_per_hour=Decimal(40),
+            from_date=date(2022, 7, 1),
+            to_date=date(2022, 7, 31),
+        )
+        generated_availability = self._get_generator().generate(2022)
+        self.assertEqual(generated_availability.n_days, 31)
+        self.assertEqual(generated_availability.n_slots, 31 * 4)
+        self.assertEqual(models.Day.objects.filter(boat=self.boat).count(), 212)
+        self.assertEqual(models.Slot.objects.filter(boat=self.boat).count(), 1572)
+        self.assertEqual(
+            models.DayOccupancy.objects.filter(boat=self.boat).count(), 212
+        )
+
+    def _get_generator(self) -> AvailabilityGenerator:
+        return AvailabilityGenerator([DjangoBoatsRepository.get(obj_id=self.boat.id)])
+
+
+class AvailabilityDeletionTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.boat = create_boat_with_availability(
+            "Boat", date(2022, 12, 1), date(2023, 1, 31), n_slots=4
+        )
+        cls.other_boat = create_boat_with_availability(
+            "Other boat", date(2022, 12, 1), date(2022, 12, 31)
+        )
+
+    def test_delete_year(self):
+        with mock.patch.object(
+            DjangoAvailabilityCache, "invalidate_dates"
+        ) as invalidate:
+            deleted_availability = DjangoAvailabilityRepository.delete_availability(
+                boat_id=self.boat.id, year=2022, chunk_size=10
+            )
+        self.assertEqual(deleted_availability.n_days, 31)
+        self.assertEqual(deleted_availability.n_slots, 31 * 4)
+        self.assertEqual(
+            {date_ for call in invalidate.call_args_list for date_ in call.args[0]},
+            {date(2022, 12, 1) + timedelta(n) for n in range(31)},
+        )
+        self.assertFalse(
+            models.Day.objects.filter(boat=self.boat, date__year=2022).exists()
+        )
+        self.assertEqual(models.Day.objects.filter(boat=self.boat).count(), 31)
+        self.assertEqual(models.Day.objects.filter(boat=self.other_boat).count(), 31)
+        self.assertEqual(models.DayOccupancy.objects.filter(boat=self.boat).count(), 31)
+
+    def test_days_and_slots_have_no_delete_receivers(self):
+        # They would make deletions load and signal every day and slot
+        for signal in (pre_delete, post_delete):
+            self.assertFalse(signal.has_listeners(models.Day))
+            self.assertFalse(signal.has_listeners(models.Slot))
+
+    def test_delete_dates(self):
+        deleted_availability = DjangoAvailabilityRepository.delete_availability(
+            boat_id=self.boat.id, from_=date(2022, 12, 30), to=date(2023, 1, 2)
+        )
+        self.assertEqual(deleted_availability.n_days, 4)
+        self.assertEqual(deleted_availability.n_slots, 4 * 4)
+
+    def test_delete_with_confirmed_bookings_requires_force(self):
+        slot = models.Slot.objects.filter(boat=self.boat, date=date(2022, 12, 24))[0]
+        booking = DjangoBookingsRepository.create(
+            price=Decimal(40),
+            slot_ids=[slot.id],
+            customer_name="Customer",
+            customer_telephone_number="600000000",
+            session_id="session",
+            extras="",
+            promocode="",
+        )
+        DjangoBookingsRepository.mark_as_paid(booking)
+
+        with self.assertRaises(AvailabilityWithConfirmedBookings):
+            DjangoAvailabilityRepository.delete_availability(
+                boat_id=self.boat.id, year=2022
+            )
+        self.assertEqual(models.Day.objects.filter(boat=self.boat).count(), 62)
+
+        deleted_availability = DjangoAvailabilityRepository.delete_availability(
+            boat_id=self.boat.id, year=2022, force=True
+        )
+        self.assertEqual(deleted_availability.n_days, 31)
+        self.assertFalse(models.Slot.objects.filter(id=slot.id).exists())
+
+
+class AvailabilityJobsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.boats = [Boat.objects.create(name=f"Boat {i}") for i in range(2)]
+
+    def test_jobs_are_claimed_in_order(self):
+        first_job = enqueue_job(AvailabilityJobActions.GENERATE, self.boats, 2022)
+        second_job = enqueue_job(
+            AvailabilityJobActions.DELETE, self.boats[:1], 2022, force=True
+        )
+        self.assertEqual(first_job.status, AvailabilityJobStatus.PENDING)
+        self.assertEqual(first_job.n_boats, 2)
+        self.assertEqual(set(first_job.boats.all()), set(self.boats))
+
+        for expected_job in (first_job, second_job):
+            job = claim_job()
+            self.assertEqual(job, expected_job)
+            self.assertEqual(job.status, AvailabilityJobStatus.RUNNING)
+            self.assertIsNotNone(job.started_at)
+            job.refresh_from_db()
+            self.assertEqual(job.status, AvailabilityJobStatus.RUNNING)
+        self.assertTrue(second_job.force)
+        self.assertIsNone(claim_job())
+
+    def test_stalled_jobs_are_requeued(self):
+        stalled_job = enqueue_job(AvailabilityJobActions.GENERATE, self.boats, 2022)
+        running_job = enqueue_job(AvailabilityJobActions.GENERATE, self.boats, 2023)
+        claim_job()
+        claim_job()
+        models.AvailabilityJob.objects.filter(id=stalled_job.id).update(
+            n_processed_boats=1,
+            modified=timezone.now()
+            - timedelta(seconds=settings.AVAILABILITY_JOB_TIMEOUT + 1),
+        )
+
+        self.assertEqual(requeue_stalled_jobs(), 1)
+        stalled_job.refresh_from_db()
+        self.assertEqual(stalled_job.status, AvailabilityJobStatus.PENDING)
+        self.assertEqual(stalled_job.n_processed_boats, 0)
+        self.assertIsNone(stalled_job.started_at)
+        self.assertIn("Requeued", stalled_job.messages)
+        running_job.refresh_from_db()
+        self.assertEqual(running_job.status, AvailabilityJobStatus.RUNNING)
+
+        self.assertEqual(claim_job(), stalled_job)
+        self.assertEqual(requeue_stalled_jobs(), 0)
+
+
+class CombinationsTestCase(SimpleTestCase):
+    N_SAMPLES = 1000
+
+    def setUp(self):
+        self.rand = random.Random(0)
+
+    def test_mask_combinations_match_free_positions_spans(self):
+        mismatches = []
+        for _ in range(self.N_SAMPLES):
+            n_slots = self.rand.randint(0, 16)
+            positions = {
+                position for position in range(n_slots) if self.rand.random() < 0.6
+            }
+            expected = [
+                (start, length)
+                for start in sorted(positions)
+                for length in range(1, n_slots + 1)
+                if set(range(start, start + length)) <= positions
+            ]
+            combinations = list(iter_mask_combinations(positions_to_mask(positions)))
+            if combinations != expected:
+                mismatches.append((positions, combinations, expected))
+        self.assertEqual(mismatches, [])
+
+    def test_day_bitmaps(self):
+        slots = [
+            domain.Slot(
+                id=position,
+                position=position,
+                from_hour=None,
+                to_hour=None,
+                booked=position in (1, 2),
+                day_id=0,
+            )
+            for position in range(4)
+        ]
+        day = domain.Day(
+            id=0,
+            date=date(2022, 7, 15),
+            day_definition_id=0,
+            slots=slots,
+            slots_mask=0b1111,
+            booked_mask=0b0110,
+        )
+        self.assertEqual(day.free_mask, 0b1001)
+        self.assertEqual(day.availability_type, DayAvailabilityTypes.PARTIALLY_FREE)
+        self.assertEqual(
+            DjangoAvailabilityRepository.get_available_slots(day),
+            [slots[0], slots[3]],
+        )
+        self.assertEqual(list(iter_mask_runs(day.free_mask)), [(0, 1), (3, 1)])
+
+
+class DateRangesTestCase(SimpleTestCase):
+    N_SAMPLES = 1000
+
+    def setUp(self):
+        self.rand = random.Random(0)
+
+    def test_find_date_ranges_collisions(self):
+        date_ranges = [
+            DateRange(from_date=date(2022, 1, 1), to_date=date(2022, 1, 10)),
+            DateRange(from_date=date(2022, 1, 11), to_date=date(2022, 1, 20)),
+            DateRange(from_date=date(2022, 1, 20), to_date=date(2022, 1, 25)),
+            DateRange(from_date=date(2021, 12, 1), to_date=date(2022, 2, 1)),
+        ]
+        self.assertEqual(
+            find_date_ranges_collisions(date_ranges), [(0, 3), (1, 2), (1, 3), (2, 3)]
+        )
+
+    def test_iter_dates_date_ranges_takes_the_first_covering_range(self):
+        date_ranges = [
+            DateRange(from_date=date(2022, 1, 2), to_date=date(2022, 1, 3)),
+            DateRange(from_date=date(2022, 1, 1), to_date=date(2022, 1, 2)),
+        ]
+        self.assertEqual(
+            list(
+                iter_dates_date_ranges(
+                    date_ranges, date(2021, 12, 31), date(2022, 1, 4)
+                )
+            ),
+            [
+                (date(2022, 1, 1), date_ranges[1]),
+                (date(2022, 1, 2), date_ranges[0]),
+                (date(2022, 1, 3), date_ranges[0]),
+            ],
+        )
+
+    def test_find_date_ranges_collisions_matches_pairwise_checks(self):
+        mismatches = []
+        for _ in range(self.N_SAMPLES):
+            date_ranges = self._get_random_date_ranges()
+            expected = [
+                (i, j)
+                for i in range(len(date_ranges))
+                for j in range(i + 1, len(date_ranges))
+                if date_ranges_collision(date_ranges[i], date_ranges[j])
+            ]
+            collisions = find_date_ranges_collisions(date_ranges)
+            if collisions != expected:
+                mismatches.append((date_ranges, collisions, expected))
+        self.assertEqual(mismatches, [])
+
+    def test_iter_dates_date_ranges_matches_per_date_checks(self):
+        mismatches = []
+        for _ in range(self.N_SAMPLES):
+            date_ranges = self._get_random_date_ranges()
+            from_date = self._get_random_date()
+            to_date = from_date + timedelta(self.rand.randint(-1, 60))
+            expected = []
+            for n in range((to_date - from_date).days + 1):
+                idate = from_date + timedelta(n)
+                for date_range in date_ranges:
+                    if date_range.from_date <= idate <= date_range.to_date:
+                        expected.append((idate, date_range))
+                        break
+            dates = list(iter_dates_date_ranges(date_ranges, from_date, to_date))
+            if dates != expected:
+                mismatches.append((date_ranges, from_date, to_date, dates, expected))
+        self.assertEqual(mismatches, [])
+
+    def _get_random_date_ranges(self) -> List[DateRange]:
+        date_ranges = []
+        for _ in range(self.rand.randint(0, 12)):
+            from_date = self._get_random_date()
+            to_date = from_date + timedelta(self.rand.randint(0, 40))
+            date_ranges.append(DateRange(from_date=from_date, to_date=to_date))
+        return date_ranges
+
+    def _get_random_date(self) -> date:
+        return date(2022, 1, 1) + timedelta(self.rand.randint(0, 90))
@@ -1,6 +1,10 @@
 from django.urls import re_path
 
-from .views import get_day_availability, get_month_availability
+from .views import (
+    get_day_availability,
+    get_month_availability,
+    get_range_availability,
+)
 
 app_name = "availability"
 
@@ -15,4 +19,9 @@ urlpatterns = [
         get_month_availability,
         name="get-month-availability",
     ),
+    re_path(
+        r"range/(?P<from_>\d{4}-\d{2}-\d{2})/(?P<to>\d{4}-\d{2}-\d{2})/",
+        get_range_availability,
+        name="get-range-availability",
+    ),
 ]
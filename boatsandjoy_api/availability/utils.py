@@ -1,8 +1,12 @@
 from calendar import Calendar
-from datetime import date, timedelta
+from datetime import date, time, timedelta
+from heapq import heappop, heappush
+from typing import Iterator, List, Sequence, Tuple, TypeVar
 
 from .domain import DateRange
 
+T = TypeVar("T")
+
 
 def daterange(start_date: date, end_date: date):
     for n in range(int((end_date - start_date).days)):
@@ -17,6 +21,63 @@ def date_ranges_collision(date_range_1: DateRange, date_range_2: DateRange):
     return True
 
 
+def find_date_ranges_collisions(date_ranges: Sequence[T]) -> List[Tuple[int, int]]:
+    """
+    Pairs (i, j), with i < j, of the indexes of every two colliding date
+    ranges. Ranges are swept by start keeping a heap of the ones still open
+    by their end, so only overlapping ranges are ever compared. Any object
+    with from_date and to_date works, as long as from_date <= to_date
+    """
+    collisions = []
+    open_ranges = []
+    for i in sorted(range(len(date_ranges)), key=lambda i: date_ranges[i].from_date):
+        date_range = date_ranges[i]
+        while open_ranges and open_ranges[0][0] < date_range.from_date:
+            heappop(open_ranges)
+        collisions.extend((min(i, j), max(i, j)) for _, j in open_ranges)
+        heappush(open_ranges, (date_range.to_date, i))
+    return sorted(collisions)
+
+
+def iter_dates_date_ranges(
+    date_ranges: Sequence[T], from_date: date, to_date: date
+) -> Iterator[Tuple[date, T]]:
+    """
+    Walks once the dates between both dates (both included) yielding each
+    date covered by some range together with the first range that covers it
+    """
+    pending_ranges = sorted(
+        range(len(date_ranges)), key=lambda i: date_ranges[i].from_date, reverse=True
+    )
+    open_ranges = []
+    for n in range((to_date - from_date).days + 1):
+        idate = from_date + timedelta(n)
+        while pending_ranges and date_ranges[pending_ranges[-1]].from_date <= idate:
+            heappush(open_ranges, pending_ranges.pop())
+        # Open ranges are kept by position, ended ones are only dropped once
+        # they would be the first one
+        while open_ranges and date_ranges[open_ranges[0]].to_date < idate:
+            heappop(open_ranges)
+        if open_ranges:
+            yield idate, date_ranges[open_ranges[0]]
+
+
+def get_minutes(time_: time) -> int:
+    """
+    Minutes since midnight
+    """
+    return time_.hour * 60 + time_.minute
+
+
 def month_date_iter(year, month):
     calendar = Calendar()
     return [d for d in calendar.itermonthdates(year, month) if d.month == month]
+
+
+def range_date_iter(from_date: date, to_date: date):
+    year, month = from_date.year, from_date.month
+    while (year, month) <= (to_date.year, to_date.month):
+        for idate in month_date_iter(year, month):
+            if from_date <= idate <= to_date:
+                yield idate
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
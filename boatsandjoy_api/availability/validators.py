@@ -1,21 +1,40 @@
+from dateutil.relativedelta import relativedelta
 from django import forms
 
-from boatsandjoy_api.core.validators import DjangoRequestValidator
-
-
-class DjangoGetAvailabilityForm(forms.Form):
-    date = forms.DateField(required=True)
-    apply_resident_discount = forms.BooleanField(required=False)
-
-
-class GetAvailabilityRequestValidator(DjangoRequestValidator):
-    FORM = DjangoGetAvailabilityForm
-
-
-class DjangoGetMonthAvailabilityForm(forms.Form):
-    month = forms.IntegerField(required=True)
-    year = forms.IntegerField(required=True)
-
-
-class GetMonthAvailabilityRequestValidator(DjangoRequestValidator):
-    FORM = DjangoGetMonthAvailabilityForm
+from boatsandjoy_api.core.validators import CompiledRequestValidator
+from .constants import AvailabilityResponseFormats
+from .requests import (
+    GetDayAvailabilityRequest,
+    GetMonthAvailabilityRequest,
+    GetRangeAvailabilityRequest,
+)
+
+
+class GetAvailabilityRequestValidator(CompiledRequestValidator):
+    REQUEST = GetDayAvailabilityRequest
+    REQUIRED = ("date", "response_format")
+    OPTIONAL = ("apply_resident_discount",)
+    CHOICES = {"response_format": AvailabilityResponseFormats.LIST}
+
+
+class GetMonthAvailabilityRequestValidator(CompiledRequestValidator):
+    REQUEST = GetMonthAvailabilityRequest
+    REQUIRED = ("month", "year")
+
+
+class GetRangeAvailabilityRequestValidator(CompiledRequestValidator):
+    REQUEST = GetRangeAvailabilityRequest
+    REQUIRED = ("from_date", "to_date")
+    MAX_MONTHS = 12
+
+    @classmethod
+    def clean(cls, cleaned_data: dict):
+        from_date = cleaned_data.get("from_date")
+        to_date = cleaned_data.get("to_date")
+        if from_date and to_date:
+            if from_date > to_date:
+                raise forms.ValidationError("from_date has to be before to_date")
+            if to_date >= from_date + relativedelta(months=cls.MAX_MONTHS):
+                raise forms.ValidationError(
+                    f"Ranges can't be longer than {cls.MAX_MONTHS} months"
+                )
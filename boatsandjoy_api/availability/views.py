@@ -1,16 +1,45 @@
+from typing import Optional
+
+from django.http import HttpRequest
+from django.views.decorators.http import condition
 from rest_framework.decorators import api_view
 from rest_framework.request import Request
 from rest_framework.response import Response
 
 from boatsandjoy_api.core.utils import cast_to_date
 from .api import api as availability_api
-from .requests import GetDayAvailabilityRequest, GetMonthAvailabilityRequest
+from .constants import AvailabilityResponseFormats
+from .requests import (
+    GetDayAvailabilityRequest,
+    GetMonthAvailabilityRequest,
+    GetRangeAvailabilityRequest,
+)
+
 
+def get_day_availability_etag(request: HttpRequest, date_: str) -> Optional[str]:
+    try:
+        api_request = GetDayAvailabilityRequest(
+            date=cast_to_date(date_),
+            apply_resident_discount=get_apply_resident_discount(request),
+            response_format=get_response_format(request),
+        )
+    except ValueError:
+        return None
+    if api_request.response_format not in dict(AvailabilityResponseFormats.LIST):
+        return None
+    request.availability_stamp = availability_api.get_day_availability_stamp(
+        api_request
+    )
+    return request.availability_stamp
 
+
+@condition(etag_func=get_day_availability_etag)
 @api_view(["GET"])
 def get_day_availability(request: Request, date_: str) -> Response:
     """
-    Get boats day availability
+    Get boats day availability, with ?response_format=compact slots are sent
+    once per boat and combinations as [start_position, length, price] (see
+    AvailabilityApi.get_day_availability)
 
     :return: {
         'error': bool,
@@ -33,9 +62,13 @@ def get_day_availability(request: Request, date_: str) -> Response:
     date_ = cast_to_date(date_)
     apply_resident_discount = get_apply_resident_discount(request)
     api_request = GetDayAvailabilityRequest(
-        date=date_, apply_resident_discount=apply_resident_discount
+        date=date_,
+        apply_resident_discount=apply_resident_discount,
+        response_format=get_response_format(request),
+    )
+    results = availability_api.get_day_availability(
+        api_request, stamp=get_availability_stamp(request)
     )
-    results = availability_api.get_day_availability(api_request)
     return Response(results)
 
 
@@ -45,6 +78,35 @@ def get_apply_resident_discount(request: Request) -> bool:
     return False
 
 
+def get_response_format(request: Request) -> str:
+    """
+    DRF already takes the format query param to choose the renderer. Values
+    out of AvailabilityResponseFormats.LIST get an error response from the api
+    """
+    return request.GET.get("response_format", AvailabilityResponseFormats.VERBOSE)
+
+
+def get_availability_stamp(request: Request) -> Optional[str]:
+    """
+    Stamp already computed for the ETag of the request, so the cache versions
+    are read once and the response always matches its ETag
+    """
+    return getattr(request, "availability_stamp", None)
+
+
+def get_month_availability_etag(request: HttpRequest, date_: str) -> Optional[str]:
+    try:
+        date_ = cast_to_date(date_)
+    except ValueError:
+        return None
+    api_request = GetMonthAvailabilityRequest(month=date_.month, year=date_.year)
+    request.availability_stamp = availability_api.get_month_availability_stamp(
+        api_request
+    )
+    return request.availability_stamp
+
+
+@condition(etag_func=get_month_availability_etag)
 @api_view(["GET"])
 def get_month_availability(request: Request, date_: str) -> Response:
     """
@@ -64,5 +126,31 @@ def get_month_availability(request: Request, date_: str) -> Response:
     """
     date_ = cast_to_date(date_)
     api_request = GetMonthAvailabilityRequest(month=date_.month, year=date_.year)
-    results = availability_api.get_month_availability(request=api_request)
+    results = availability_api.get_month_availability(
+        request=api_request, stamp=get_availability_stamp(request)
+    )
+    return Response(results)
+
+
+@api_view(["GET"])
+def get_range_availability(request: Request, from_: str, to: str) -> Response:
+    """
+    Get boats availability for every day between two dates (up to 12 months)
+
+    :return: {
+        'error': bool,
+        'data': [
+            {
+                'name': 'DayAvailabilityTypes',
+                'date': 'YYYY-MM-DD',
+                'availability': bool
+            },
+            ...
+        ]
+    }
+    """
+    api_request = GetRangeAvailabilityRequest(
+        from_date=cast_to_date(from_), to_date=cast_to_date(to)
+    )
+    results = availability_api.get_range_availability(request=api_request)
     return Response(results)
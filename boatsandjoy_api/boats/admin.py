@@ -8,44 +8,41 @@ from django.http import HttpRequest
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 
-from boatsandjoy_api.availability.availability_generators import (
-    AvailabilityGenerator,
-)
+from boatsandjoy_api.availability.cache import DjangoAvailabilityCache
+from boatsandjoy_api.availability.constants import AvailabilityJobActions
 from boatsandjoy_api.availability.domain import DateRange
+from boatsandjoy_api.availability.jobs import enqueue_job
 from boatsandjoy_api.availability.models import (
+    AvailabilityJob,
     Day,
     DayDefinition,
     PriceVariation,
 )
-from boatsandjoy_api.availability.utils import date_ranges_collision
-from boatsandjoy_api.core.exceptions import BoatsAndJoyException
+from boatsandjoy_api.availability.utils import find_date_ranges_collisions
+from .api import active_boats_registry
 from .models import Boat
 
 
 class DayDefinitionInlineFormset(BaseInlineFormSet):
     def clean(self):
-        for i, day_definition1 in enumerate(self.cleaned_data):
-            for j, day_definition2 in enumerate(self.cleaned_data):
-                if day_definition2["from_date"] > day_definition2["to_date"]:
-                    raise ValidationError(
-                        f"Some day definition has its from "
-                        f"date greater than its to date"
-                    )
-                if i != j:
-                    if date_ranges_collision(
-                        DateRange(
-                            from_date=day_definition1["from_date"],
-                            to_date=day_definition1["to_date"],
-                        ),
-                        DateRange(
-                            from_date=day_definition2["from_date"],
-                            to_date=day_definition2["to_date"],
-                        ),
-                    ):
-                        raise ValidationError(
-                            f"Exists a collision between the "
-                            f"date ranges of some day definitions"
-                        )
+        date_ranges = []
+        for day_definition in self.cleaned_data:
+            if day_definition["from_date"] > day_definition["to_date"]:
+                raise ValidationError(
+                    f"Some day definition has its from "
+                    f"date greater than its to date"
+                )
+            date_ranges.append(
+                DateRange(
+                    from_date=day_definition["from_date"],
+                    to_date=day_definition["to_date"],
+                )
+            )
+        if find_date_ranges_collisions(date_ranges):
+            raise ValidationError(
+                f"Exists a collision between the "
+                f"date ranges of some day definitions"
+            )
         return self.cleaned_data
 
 
@@ -63,37 +60,28 @@ class DayDefinitionInlineAdmin(admin.StackedInline):
 
 class PriceVariationInlineFormset(BaseInlineFormSet):
     def clean(self):
-        for i, price_variation1 in enumerate(self.cleaned_data):
-            for j, price_variation2 in enumerate(self.cleaned_data):
-                if (
-                    "from_date" not in price_variation2
-                    or "to_date" not in price_variation2
-                    or "from_date" not in price_variation1
-                    or "to_date" not in price_variation1
-                ):
-                    raise ValidationError(
-                        "Some price variations have not " "all its required data filled"
-                    )
-                if price_variation2["from_date"] > price_variation2["to_date"]:
-                    raise ValidationError(
-                        f"Some price definition has its from "
-                        f"date greater than its to date"
-                    )
-                if i != j:
-                    if date_ranges_collision(
-                        DateRange(
-                            from_date=price_variation1["from_date"],
-                            to_date=price_variation1["to_date"],
-                        ),
-                        DateRange(
-                            from_date=price_variation2["from_date"],
-                            to_date=price_variation2["to_date"],
-                        ),
-                    ):
-                        raise ValidationError(
-                            f"Exists a collision between the "
-                            f"date ranges of some price variations"
-                        )
+        date_ranges = []
+        for price_variation in self.cleaned_data:
+            if "from_date" not in price_variation or "to_date" not in price_variation:
+                raise ValidationError(
+                    "Some price variations have not " "all its required data filled"
+                )
+            if price_variation["from_date"] > price_variation["to_date"]:
+                raise ValidationError(
+                    f"Some price definition has its from "
+                    f"date greater than its to date"
+                )
+            date_ranges.append(
+                DateRange(
+                    from_date=price_variation["from_date"],
+                    to_date=price_variation["to_date"],
+                )
+            )
+        if find_date_ranges_collisions(date_ranges):
+            raise ValidationError(
+                f"Exists a collision between the "
+                f"date ranges of some price variations"
+            )
         return self.cleaned_data
 
 
@@ -117,16 +105,8 @@ def generate_availability_for(modeladmin, request: HttpRequest, queryset: QueryS
     except ValueError:
         messages.add_message(request, messages.ERROR, "You have to specify a year")
         return
-    for boat in queryset:
-        try:
-            availability_generator = AvailabilityGenerator(boat)
-            availability_generator.generate(year)
-        except BoatsAndJoyException as e:
-            messages.add_message(
-                request,
-                messages.ERROR,
-                f"Unable to generate availability for boat {boat} because {e}",
-            )
+    job = enqueue_job(AvailabilityJobActions.GENERATE, queryset, year)
+    _add_job_message(request, job)
 
 
 generate_availability_for.short_description = "Generate availability for year"
@@ -140,23 +120,43 @@ def delete_availability_for(modeladmin, request: HttpRequest, queryset: QuerySet
     except Exception:
         messages.add_message(request, messages.ERROR, "You have to specify a year")
         return
-    for boat in queryset:
-        try:
-            availability_generator = AvailabilityGenerator(boat)
-            availability_generator.delete(year)
-        except BoatsAndJoyException as e:
-            messages.add_message(
-                request,
-                messages.ERROR,
-                f"Unable to delete availability for boat {boat} because {e}",
-            )
+    job = enqueue_job(AvailabilityJobActions.DELETE, queryset, year)
+    _add_job_message(request, job)
 
 
 delete_availability_for.short_description = "Delete availability for year"
 
 
+def force_delete_availability_for(modeladmin, request: HttpRequest, queryset: QuerySet):
+    try:
+        year = int(request.POST["year"])
+        if not year:
+            raise Exception
+    except Exception:
+        messages.add_message(request, messages.ERROR, "You have to specify a year")
+        return
+    job = enqueue_job(AvailabilityJobActions.DELETE, queryset, year, force=True)
+    _add_job_message(request, job)
+
+
+force_delete_availability_for.short_description = (
+    "Delete availability for year, even with confirmed bookings"
+)
+
+
+def _add_job_message(request: HttpRequest, job: AvailabilityJob):
+    url = reverse("admin:availability_availabilityjob_change", args=[job.id])
+    messages.add_message(
+        request,
+        messages.INFO,
+        mark_safe(f'<a href="{url}">{job}</a> queued, it will run in background'),
+    )
+
+
 def deactivate_selected_boats(modeladmin, request: HttpRequest, queryset: QuerySet):
     queryset.update(active=False)
+    active_boats_registry.invalidate()
+    DjangoAvailabilityCache.invalidate_all()
 
 
 deactivate_selected_boats.short_description = "Deactivate selected boats"
@@ -182,6 +182,7 @@ class BoatAdmin(admin.ModelAdmin):
     actions = [
         generate_availability_for,
         delete_availability_for,
+        force_delete_availability_for,
         deactivate_selected_boats,
     ]
 
@@ -205,7 +206,7 @@ class BoatAdmin(admin.ModelAdmin):
 
     def get_availability_link(self, obj: Boat) -> str:
         url = reverse(f"admin:availability_day_changelist")
-        url += f"?definition__boat__id__exact={obj.id}"
+        url += f"?boat__id__exact={obj.id}"
         return mark_safe(f'<a href="{url}" target="_blank">Check availability</a>')
 
     get_availability_link.short_description = "Availability"
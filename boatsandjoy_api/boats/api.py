@@ -1,11 +1,17 @@
 from dataclasses import asdict
-from typing import Type
+from typing import List, Optional, Tuple, Type
 
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+
+from boatsandjoy_api.core.cache import LocalVersion
 from boatsandjoy_api.core.responses import (
     ErrorResponseBuilder,
     ResponseBuilder,
     ResponseBuilderInterface,
 )
+from .domain import Boat
 from .exceptions import BoatsApiException
 from .repository import BoatsRepository, DjangoBoatsRepository
 from .requests import FilterBoatsRequest
@@ -42,4 +48,40 @@ class BoatsApi:
             return self.error_builder(e).build()
 
 
+class ActiveBoatsRegistry:
+    """
+    Active boats kept in memory by each process. Changes bump a version in a
+    cache shared by every process, which reload the boats when they see it.
+    The version is read once per request, see LocalVersion
+    """
+
+    VERSION_KEY = "boats:active:version"
+
+    def __init__(self, boats_repository: Type[BoatsRepository]):
+        self.boats_repository = boats_repository
+        self._version = LocalVersion(self._get_cache, self.VERSION_KEY)
+        self._active_boats: Optional[Tuple[str, List[Boat]]] = None
+
+    def get_active_boats(self) -> List[Boat]:
+        version = self._version.get()
+        if self._active_boats is None or self._active_boats[0] != version:
+            self._active_boats = (
+                version,
+                self.boats_repository.filter(active=True),
+            )
+        return list(self._active_boats[1])
+
+    def invalidate(self):
+        """
+        The version is bumped once the current transaction commits, otherwise
+        a process could reload the boats before the change is visible
+        """
+        transaction.on_commit(self._version.bump)
+
+    @staticmethod
+    def _get_cache() -> BaseCache:
+        return caches[settings.BOATS_CACHE]
+
+
 api = BoatsApi(DjangoBoatsRepository, ResponseBuilder, ErrorResponseBuilder)
+active_boats_registry = ActiveBoatsRegistry(DjangoBoatsRepository)
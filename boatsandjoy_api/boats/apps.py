@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BoatsConfig(AppConfig):
     name = "boatsandjoy_api.boats"
     verbose_name = "Boats"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .api import active_boats_registry
+from .models import Boat
+
+
+@receiver(post_save, sender=Boat)
+@receiver(post_delete, sender=Boat)
+def invalidate_active_boats(sender, **kwargs):
+    active_boats_registry.invalidate()
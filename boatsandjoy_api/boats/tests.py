@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase
+
+from boatsandjoy_api.core.cache import bump_version, forget_local_versions
+from .admin import deactivate_selected_boats
+from .api import ActiveBoatsRegistry, active_boats_registry
+from .models import Boat
+
+
+class ActiveBoatsRegistryTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.boat = Boat.objects.create(name="Boat")
+        Boat.objects.create(name="Inactive boat", active=False)
+
+    def setUp(self):
+        caches[settings.BOATS_CACHE].clear()
+        forget_local_versions()
+
+    def test_active_boats_are_kept_in_memory(self):
+        self.assertEqual(self._get_active_boat_names(), ["Boat"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self._get_active_boat_names(), ["Boat"])
+
+    def test_boat_changes_reload_active_boats(self):
+        self._get_active_boat_names()
+        with self.captureOnCommitCallbacks(execute=True):
+            Boat.objects.create(name="New boat")
+        self.assertEqual(self._get_active_boat_names(), ["Boat", "New boat"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.boat.delete()
+        self.assertEqual(self._get_active_boat_names(), ["New boat"])
+
+    def test_deactivated_boats_are_not_active(self):
+        self._get_active_boat_names()
+        with self.captureOnCommitCallbacks(execute=True):
+            deactivate_selected_boats(None, None, Boat.objects.filter(id=self.boat.id))
+        self.assertEqual(self._get_active_boat_names(), [])
+
+    def test_changes_from_other_processes_are_seen_on_next_request(self):
+        self._get_active_boat_names()
+        Boat.objects.filter(name="Inactive boat").update(active=True)
+        bump_version(caches[settings.BOATS_CACHE], ActiveBoatsRegistry.VERSION_KEY)
+        self.assertEqual(self._get_active_boat_names(), ["Boat"])
+
+        forget_local_versions()
+        self.assertEqual(self._get_active_boat_names(), ["Boat", "Inactive boat"])
+
+    @staticmethod
+    def _get_active_boat_names() -> list:
+        return sorted(boat.name for boat in active_boats_registry.get_active_boats())
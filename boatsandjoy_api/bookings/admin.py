@@ -1,8 +1,11 @@
 from django.contrib import admin, messages
-from django.db.models import QuerySet
+from django.db import transaction
+from django.db.models import Prefetch, QuerySet
 from django.http import HttpRequest
 from django.utils.safestring import mark_safe
 
+from boatsandjoy_api.availability.models import Slot
+from boatsandjoy_api.availability.repository import DjangoAvailabilityRepository
 from boatsandjoy_api.core.exceptions import BoatsAndJoyException
 from .constants import BookingStatus
 from .exceptions import BookingAlreadyConfirmed, BookingAlreadyPending
@@ -16,11 +19,16 @@ def confirm_booking(modeladmin, request: HttpRequest, queryset: QuerySet):
                 raise BookingAlreadyConfirmed(
                     f"Booking {booking.locator} already confirmed!"
                 )
-            booking.status = BookingStatus.CONFIRMED
-            booking.save()
-            for slot in booking.slots.all():
-                slot.booked = True
-                slot.save()
+            with transaction.atomic():
+                booking.status = BookingStatus.CONFIRMED
+                booking.save()
+                slots = booking.slots.all()
+                for slot in slots:
+                    slot.booked = True
+                    slot.save()
+                DjangoAvailabilityRepository.refresh_days_occupancy(
+                    day_ids=list({slot.day_id for slot in slots})
+                )
 
         except BoatsAndJoyException as e:
             messages.add_message(request, messages.ERROR, str(e))
@@ -33,11 +41,16 @@ def unconfirm_booking(modeladmin, request: HttpRequest, queryset: QuerySet):
                 raise BookingAlreadyPending(
                     f"Booking {booking.locator} already pending!"
                 )
-            booking.status = BookingStatus.PENDING
-            booking.save()
-            for slot in booking.slots.all():
-                slot.booked = False
-                slot.save()
+            with transaction.atomic():
+                booking.status = BookingStatus.PENDING
+                booking.save()
+                slots = booking.slots.all()
+                for slot in slots:
+                    slot.booked = False
+                    slot.save()
+                DjangoAvailabilityRepository.refresh_days_occupancy(
+                    day_ids=list({slot.day_id for slot in slots})
+                )
 
         except BoatsAndJoyException as e:
             messages.add_message(request, messages.ERROR, str(e))
@@ -60,14 +73,25 @@ class BookingAdmin(admin.ModelAdmin):
     )
     actions = [confirm_booking, unconfirm_booking]
 
+    def get_queryset(self, request: HttpRequest) -> QuerySet:
+        return (
+            super()
+            .get_queryset(request)
+            .prefetch_related(
+                Prefetch("slots", queryset=Slot.objects.order_by("position"))
+            )
+        )
+
     def get_date_and_hours(self, obj: Booking) -> str:
-        slots = obj.slots.all()
-        first_slot = slots.first()
-        last_slot = slots.last()
+        slots = list(obj.slots.all())
         time_str = ""
-        if first_slot and last_slot:
-            day = first_slot.day.date if first_slot.day else ""
-            time_str = f"{day}: from {first_slot.from_hour} to " f"{last_slot.to_hour}"
+        if slots:
+            first_slot = slots[0]
+            last_slot = slots[-1]
+            time_str = (
+                f"{first_slot.date}: from {first_slot.from_hour} to "
+                f"{last_slot.to_hour}"
+            )
         return time_str
 
     get_date_and_hours.short_description = "Date and hours"
@@ -6,7 +6,7 @@ from typing import Type
 from django.conf import settings
 from django.db.models import F
 
-from boatsandjoy_api.availability import models as availability_models
+from boatsandjoy_api.availability import pricing
 from boatsandjoy_api.boats.api import api as boats_api
 from boatsandjoy_api.bookings import models as booking_models
 from boatsandjoy_api.bookings.models import Promocode
@@ -66,15 +66,15 @@ class BookingsApi:
         try:
             BookingCreationRequestValidator.validate(request)
 
-            price = request.base_price
-            booking_day = availability_models.Slot.objects.get(
-                id=request.slot_ids[0]
-            ).day.date
-            price = self._apply_discounts(
-                price,
-                request.is_resident,
+            boat_day = self.bookings_repository.get_boat_day(request.slot_ids)
+            n_slots = len(request.slot_ids)
+            price_table = pricing.get_price_table(
+                boat_day.day_definition, boat_day.price_variations, max_length=n_slots
+            )
+            price = self._apply_promocode(
+                price_table.get_price(n_slots, request.is_resident),
                 request.promocode,
-                booking_day,
+                boat_day.day.date,
             )
             purchase_details = self.bookings_repository.get_purchase_details(
                 slot_ids=request.slot_ids,
@@ -99,16 +99,11 @@ class BookingsApi:
             return self.error_builder(e).build()
 
     @staticmethod
-    def _apply_discounts(
-        price: Decimal,
-        is_resident: bool,
-        promocode: str,
-        booking_day: date,
-    ) -> Decimal:
-        discount = Decimal(0)
-        if is_resident:
-            discount += Decimal(settings.RESIDENT_DISCOUNT)
-
+    def _apply_promocode(price: Decimal, promocode: str, booking_day: date) -> Decimal:
+        """
+        The price comes from the price table of the booking day, with the
+        resident discount already applied
+        """
         use_day = date.today()
         try:
             promocode = Promocode.objects.get(
@@ -119,15 +114,9 @@ class BookingsApi:
                 booking_to__gte=booking_day,
                 number_of_uses__lt=F("limit_of_uses"),
             )
-            discount += Decimal(promocode.factor)
         except Promocode.DoesNotExist:
-            pass
-
-        price_as_decimal = price
-        if isinstance(price, float):
-            price_as_decimal = Decimal(price)
-
-        return price_as_decimal - (price_as_decimal * discount)
+            return price
+        return pricing.apply_discount(price, promocode.factor)
 
     def get(self, request: GetBookingRequest):
         try:
@@ -152,7 +141,7 @@ class BookingsApi:
 
     def mark_as_error(self, request: MarkBookingAsErrorRequest):
         try:
-            GetBookingBySessionRequestValidator.validate(request)
+            IdentifyBookingBySessionRequestValidator.validate(request)
             booking = self.bookings_repository.get(**asdict(request))
             if booking.status != BookingStatus.CONFIRMED:
                 self._send_payment_error_notification_email(booking)
@@ -194,7 +183,7 @@ class BookingsApi:
 
     def get_booking_by_session(self, request: GetBookingBySessionRequest):
         try:
-            IdentifyBookingBySessionRequestValidator.validate(request)
+            GetBookingBySessionRequestValidator.validate(request)
             request_dict = asdict(request)
             booking = self.bookings_repository.get(**request_dict)
             return self.response_builder(booking).build()
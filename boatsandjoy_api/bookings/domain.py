@@ -4,7 +4,7 @@ from decimal import Decimal
 from typing import List
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Booking:
     id: int
     locator: str
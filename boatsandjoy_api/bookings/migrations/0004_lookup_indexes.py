@@ -0,0 +1,25 @@
+# Generated by Django 3.2 on 2026-10-18 14:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookings", "0003_auto_20220303_1848"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["session_id"], name="bookings_bo_session_318b20_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="promocode",
+            index=models.Index(
+                fields=["name", "use_from", "use_to"],
+                name="bookings_pr_name_448957_idx",
+            ),
+        ),
+    ]
@@ -29,6 +29,7 @@ class Booking(BaseModel):
     class Meta:
         verbose_name = "booking"
         verbose_name_plural = "bookings"
+        indexes = [models.Index(fields=("session_id",))]
 
 
 class Promocode(BaseModel):
@@ -55,3 +56,4 @@ class Promocode(BaseModel):
     class Meta:
         verbose_name = "promocode"
         verbose_name_plural = "promocodes"
+        indexes = [models.Index(fields=("name", "use_from", "use_to"))]
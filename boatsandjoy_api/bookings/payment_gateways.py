@@ -4,6 +4,8 @@ from decimal import Decimal
 import stripe
 from django.conf import settings
 
+from boatsandjoy_api.availability.pricing import round_cents, to_cents
+
 
 class PaymentGateway(ABC):
     @classmethod
@@ -64,4 +66,4 @@ class StripePaymentGateway(PaymentGateway):
 
     @staticmethod
     def _format_price(price):
-        return int(float(price) * 100)
+        return round_cents(to_cents(price))
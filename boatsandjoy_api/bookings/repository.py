@@ -1,12 +1,18 @@
 import random
 import string
 from abc import ABC, abstractmethod
+from dataclasses import replace
 from decimal import Decimal
 from typing import List
 
-from django.db import DatabaseError
+from django.db import DatabaseError, transaction
+from django.db.models import Prefetch, QuerySet, prefetch_related_objects
+from django.utils import timezone
 
+from boatsandjoy_api.availability.cache import DjangoAvailabilityCache
+from boatsandjoy_api.availability.domain import BoatDay
 from boatsandjoy_api.availability.models import Slot
+from boatsandjoy_api.availability.repository import DjangoAvailabilityRepository
 from boatsandjoy_api.core.data_adapters import DjangoDataAdapter
 from . import domain, models
 from .constants import BookingStatus
@@ -38,6 +44,11 @@ class BookingsRepository(ABC):
     def get_purchase_details(cls, price: Decimal, slot_ids: List[int]) -> dict:
         pass
 
+    @classmethod
+    @abstractmethod
+    def get_boat_day(cls, slot_ids: List[int]) -> BoatDay:
+        pass
+
     @classmethod
     @abstractmethod
     def get(
@@ -96,17 +107,22 @@ class DjangoBookingsRepository(BookingsRepository):
             booking.slots.add(*slot_ids)
         except DatabaseError as e:
             raise BookingInvalidDataError(str(e))
+        prefetch_related_objects([booking], cls._get_slots_prefetch())
         return cls.get_booking_domain_object(booking)
 
     @classmethod
     def get_purchase_details(cls, price: Decimal, slot_ids: List[int]) -> dict:
-        slots = Slot.objects.filter(id__in=slot_ids).order_by("position")
+        slots = list(
+            Slot.objects.filter(id__in=slot_ids)
+            .select_related("boat")
+            .order_by("position")
+        )
         if not slots:
             raise NoSlotsSelected("A purchase requires slots!")
-        first_slot = slots.first()
-        last_slot = slots.last()
-        boat = first_slot.day.definition.boat
-        day = first_slot.day.date
+        first_slot = slots[0]
+        last_slot = slots[-1]
+        boat = first_slot.boat
+        day = first_slot.date
         purchase_details = {
             "name": boat.name,
             "description": (
@@ -117,6 +133,29 @@ class DjangoBookingsRepository(BookingsRepository):
         }
         return purchase_details
 
+    @classmethod
+    def get_boat_day(cls, slot_ids: List[int]) -> BoatDay:
+        """
+        Day, definition and price variations the given slots are priced with
+        """
+        boats_dates = list(
+            Slot.objects.filter(id__in=slot_ids)
+            .values_list("boat_id", "date")
+            .order_by()
+            .distinct()
+        )
+        if not boats_dates:
+            raise NoSlotsSelected("A booking requires slots!")
+        if len(boats_dates) > 1:
+            raise BookingInvalidDataError("Slots must be of the same boat and day")
+        [(boat_id, date_)] = boats_dates
+        boats_days = DjangoAvailabilityRepository.filter_boats_days([boat_id], date_)
+        if boat_id not in boats_days:
+            raise BookingInvalidDataError(
+                f"This boat has not a day definition for day {date_}"
+            )
+        return boats_days[boat_id]
+
     @classmethod
     def get(
         cls, obj_id: int = None, session_id: str = None, status: str = None
@@ -125,31 +164,21 @@ class DjangoBookingsRepository(BookingsRepository):
             id=obj_id, session_id=session_id, status=status
         )
         try:
-            booking = models.Booking.objects.get(**django_filters)
+            booking = cls.get_bookings_queryset().get(**django_filters)
         except models.Booking.DoesNotExist as e:
             raise BookingNotFound(f"Booking not found: {e}")
         return cls.get_booking_domain_object(booking)
 
     @classmethod
     def mark_as_paid(cls, booking: domain.Booking) -> domain.Booking:
-        try:
-            booking = models.Booking.objects.get(id=booking.id)
-        except models.Booking.DoesNotExist as e:
-            raise BookingNotFound(f"Booking not found: {e}")
-        booking.status = BookingStatus.CONFIRMED
-        booking.save()
-        cls._mark_slots_as_booked(booking)
-        return cls.get_booking_domain_object(booking)
+        with transaction.atomic():
+            booking = cls._update(booking, status=BookingStatus.CONFIRMED)
+            cls._mark_slots_as_booked(booking)
+        return booking
 
     @classmethod
     def mark_as_error(cls, booking: domain.Booking) -> domain.Booking:
-        try:
-            booking = models.Booking.objects.get(id=booking.id)
-        except models.Booking.DoesNotExist as e:
-            raise BookingNotFound(f"Booking not found: {e}")
-        booking.status = BookingStatus.ERROR
-        booking.save()
-        return cls.get_booking_domain_object(booking)
+        return cls._update(booking, status=BookingStatus.ERROR)
 
     @classmethod
     def update(
@@ -158,21 +187,30 @@ class DjangoBookingsRepository(BookingsRepository):
         customer_email: str = None,
         session_id: str = None,
     ) -> domain.Booking:
-        try:
-            booking = models.Booking.objects.get(id=booking.id)
-        except models.Booking.DoesNotExist as e:
-            raise BookingNotFound(f"Booking not found: {e}")
+        fields = {}
         if customer_email:
-            booking.customer_email = customer_email
+            fields["customer_email"] = customer_email
         if session_id:
-            booking.session_id = session_id
-        booking.save()
-        return cls.get_booking_domain_object(booking)
+            fields["session_id"] = session_id
+        return cls._update(booking, **fields)
+
+    @classmethod
+    def get_bookings_queryset(cls) -> QuerySet:
+        """
+        Bookings with their slots prefetched, so any number of them is turned
+        into domain objects with two queries
+        """
+        return models.Booking.objects.prefetch_related(cls._get_slots_prefetch())
 
     @classmethod
     def get_booking_domain_object(cls, booking: models.Booking) -> domain.Booking:
-        slots = booking.slots.order_by("position")
-        boat = slots.first().day.definition.boat
+        """
+        Expects the slots of the booking to be prefetched, see
+        get_bookings_queryset
+        """
+        slots = list(booking.slots.all())
+        first_slot = slots[0]
+        last_slot = slots[-1]
         return domain.Booking(
             id=booking.id,
             locator=booking.locator,
@@ -180,12 +218,12 @@ class DjangoBookingsRepository(BookingsRepository):
             price=booking.price,
             status=booking.status,
             session_id=booking.session_id,
-            boat_id=boat.id,
-            boat_name=boat.name,
-            slot_ids=list(slots.values_list("id", flat=True)),
-            date=slots.first().day.date,
-            checkin_hour=slots.first().from_hour,
-            checkout_hour=slots.last().to_hour,
+            boat_id=first_slot.boat_id,
+            boat_name=first_slot.boat.name,
+            slot_ids=[slot.id for slot in slots],
+            date=first_slot.date,
+            checkin_hour=first_slot.from_hour,
+            checkout_hour=last_slot.to_hour,
             customer_email=booking.customer_email,
             customer_name=booking.customer_name,
             customer_telephone_number=booking.customer_telephone_number,
@@ -194,10 +232,35 @@ class DjangoBookingsRepository(BookingsRepository):
         )
 
     @staticmethod
-    def _mark_slots_as_booked(booking: models.Booking):
-        for slot in booking.slots.all():
-            slot.booked = True
-            slot.save()
+    def _get_slots_prefetch() -> Prefetch:
+        return Prefetch(
+            "slots", queryset=Slot.objects.select_related("boat").order_by("position")
+        )
+
+    @staticmethod
+    def _update(booking: domain.Booking, **fields) -> domain.Booking:
+        """
+        Writes the given fields and applies them to the domain object instead
+        of reading the booking again. Queryset updates don't send post_save, so
+        the cached availability of the booking date is invalidated here when
+        the status is written. Customer email and session updates don't affect
+        availability
+        """
+        n_updated = models.Booking.objects.filter(id=booking.id).update(
+            modified=timezone.now(), **fields
+        )
+        if not n_updated:
+            raise BookingNotFound(f"Booking not found: {booking.id}")
+        if "status" in fields:
+            DjangoAvailabilityCache.invalidate_dates([booking.date])
+        return replace(booking, **fields)
+
+    @staticmethod
+    def _mark_slots_as_booked(booking: domain.Booking):
+        slots = Slot.objects.filter(id__in=booking.slot_ids)
+        day_ids = list(set(slots.values_list("day_id", flat=True)))
+        slots.update(booked=True, modified=timezone.now())
+        DjangoAvailabilityRepository.refresh_days_occupancy(day_ids=day_ids)
 
     @staticmethod
     def _generate_locator(length=20):
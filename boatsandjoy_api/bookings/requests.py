@@ -1,11 +1,9 @@
 from dataclasses import dataclass
-from decimal import Decimal
 from typing import List, Optional
 
 
 @dataclass
 class CreateBookingRequest:
-    base_price: Decimal
     slot_ids: List[int]
     customer_name: str
     customer_telephone_number: str
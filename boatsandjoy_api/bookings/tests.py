@@ -0,0 +1,112 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+
+from boatsandjoy_api.availability.cache import DjangoAvailabilityCache
+from boatsandjoy_api.availability.models import DayDefinition, Slot
+from boatsandjoy_api.availability.repository import DjangoAvailabilityRepository
+from boatsandjoy_api.availability.tests import reset_availability_caches
+from boatsandjoy_api.boats.models import Boat
+from .constants import BookingStatus
+from .repository import DjangoBookingsRepository
+
+
+class BookingsRepositoryTestCase(TestCase):
+    DATE = date(2022, 7, 15)
+
+    @classmethod
+    def setUpTestData(cls):
+        boat = Boat.objects.create(name="Boat")
+        day_definition = DayDefinition.objects.create(
+            boat=boat,
+            n_slots=8,
+            hours_per_slot=1,
+            price_per_hour=Decimal(40),
+            from_date=cls.DATE,
+            to_date=cls.DATE,
+        )
+        DjangoAvailabilityRepository.create_availability(
+            [
+                DjangoAvailabilityRepository.get_day_definition_domain_object(
+                    day_definition
+                )
+            ],
+            from_=cls.DATE,
+            to=cls.DATE,
+        )
+        cls.slot_ids = list(
+            Slot.objects.filter(position__lt=2).values_list("id", flat=True)
+        )
+
+    def setUp(self):
+        reset_availability_caches()
+        self.booking = self._create_booking(self.slot_ids, "session")
+
+    def test_update_keeps_cached_availability(self):
+        with mock.patch.object(
+            DjangoAvailabilityCache, "invalidate_dates"
+        ) as invalidate:
+            booking = DjangoBookingsRepository.update(
+                self.booking,
+                customer_email="customer@boatsandjoy.com",
+                session_id="new_session",
+            )
+        invalidate.assert_not_called()
+        self.assertEqual(booking.customer_email, "customer@boatsandjoy.com")
+        self.assertEqual(booking.session_id, "new_session")
+        self.assertEqual(DjangoBookingsRepository.get(obj_id=self.booking.id), booking)
+
+    def test_status_changes_invalidate_cached_availability(self):
+        with mock.patch.object(
+            DjangoAvailabilityCache, "invalidate_dates"
+        ) as invalidate:
+            booking = DjangoBookingsRepository.mark_as_error(self.booking)
+        invalidate.assert_called_once_with([self.DATE])
+        self.assertEqual(booking.status, BookingStatus.ERROR)
+
+    def test_mark_as_paid_books_the_slots(self):
+        booking = DjangoBookingsRepository.mark_as_paid(self.booking)
+        self.assertEqual(booking.status, BookingStatus.CONFIRMED)
+        self.assertEqual(
+            set(Slot.objects.filter(booked=True).values_list("id", flat=True)),
+            set(self.slot_ids),
+        )
+        [boat_day] = DjangoAvailabilityRepository.filter_boats_days(
+            [booking.boat_id], self.DATE
+        ).values()
+        self.assertEqual(boat_day.day.booked_mask, 0b11)
+
+    def test_bookings_are_read_with_two_queries(self):
+        with self.assertNumQueries(2):
+            booking = DjangoBookingsRepository.get(session_id="session")
+        self.assertEqual(booking, self.booking)
+        self.assertEqual(booking.slot_ids, self.slot_ids)
+
+        for position in range(2, 8):
+            self._create_booking(
+                list(
+                    Slot.objects.filter(position=position).values_list("id", flat=True)
+                ),
+                f"session_{position}",
+            )
+        with self.assertNumQueries(2):
+            bookings = [
+                DjangoBookingsRepository.get_booking_domain_object(booking)
+                for booking in DjangoBookingsRepository.get_bookings_queryset()
+            ]
+        self.assertEqual(len(bookings), 7)
+        self.assertEqual({booking.boat_name for booking in bookings}, {"Boat"})
+
+    @staticmethod
+    def _create_booking(slot_ids: list, session_id: str):
+        return DjangoBookingsRepository.create(
+            price=Decimal(80),
+            slot_ids=slot_ids,
+            customer_name="Customer",
+            customer_telephone_number="600000000",
+            session_id=session_id,
+            extras="",
+            promocode="",
+        )
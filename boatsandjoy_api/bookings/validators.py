@@ -1,36 +1,28 @@
-from django import forms
+from boatsandjoy_api.core.validators import CompiledRequestValidator
+from .requests import (
+    CreateBookingRequest,
+    GetBookingBySessionRequest,
+    GetBookingRequest,
+    MarkBookingAsErrorRequest,
+)
 
-from boatsandjoy_api.core.utils import MultipleIntField
-from boatsandjoy_api.core.validators import DjangoRequestValidator
 
+class BookingCreationRequestValidator(CompiledRequestValidator):
+    REQUEST = CreateBookingRequest
+    REQUIRED = ("slot_ids", "customer_name", "customer_telephone_number")
+    OPTIONAL = ("extras",)
 
-class DjangoBookingCreationForm(forms.Form):
-    base_price = forms.DecimalField(required=True)
-    slot_ids = MultipleIntField(required=True)
-    customer_name = forms.CharField(required=True)
-    customer_telephone_number = forms.CharField(required=True)
-    extras = forms.CharField(required=False)
 
+class GetBookingRequestValidator(CompiledRequestValidator):
+    REQUEST = GetBookingRequest
+    REQUIRED = ("obj_id",)
 
-class DjangoGetBookingForm(forms.Form):
-    obj_id = forms.IntegerField(required=True)
 
+class IdentifyBookingBySessionRequestValidator(CompiledRequestValidator):
+    REQUEST = MarkBookingAsErrorRequest
+    REQUIRED = ("session_id",)
 
-class BookingCreationRequestValidator(DjangoRequestValidator):
-    FORM = DjangoBookingCreationForm
 
-
-class GetBookingRequestValidator(DjangoRequestValidator):
-    FORM = DjangoGetBookingForm
-
-
-class DjangoIdentifyBookingBySessionForm(forms.Form):
-    session_id = forms.CharField(required=True)
-
-
-class IdentifyBookingBySessionRequestValidator(DjangoRequestValidator):
-    FORM = DjangoIdentifyBookingBySessionForm
-
-
-class GetBookingBySessionRequestValidator(IdentifyBookingBySessionRequestValidator):
-    pass
+class GetBookingBySessionRequestValidator(CompiledRequestValidator):
+    REQUEST = GetBookingBySessionRequest
+    REQUIRED = ("session_id",)
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     name = "boatsandjoy_api.core"
     verbose_name = "Core"
+
+    def ready(self):
+        from django.core.signals import request_started
+
+        from .cache import forget_local_versions
+
+        request_started.connect(forget_local_versions)
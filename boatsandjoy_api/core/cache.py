@@ -0,0 +1,85 @@
+import secrets
+import time
+from threading import local
+from typing import Callable, Dict, List, Tuple
+
+from django.conf import settings
+from django.core.cache import BaseCache
+
+
+def get_versions(cache: BaseCache, keys: List[str]) -> List[str]:
+    """
+    Versions are random tokens instead of counters, so a version evicted
+    from the cache never comes back with a value already used in other keys
+    """
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            version = new_version()
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+            versions[key] = version
+    return [versions[key] for key in keys]
+
+
+def bump_version(cache: BaseCache, key: str):
+    cache.set(key, new_version(), timeout=None)
+
+
+def new_version() -> str:
+    return secrets.token_hex(8)
+
+
+def increment_counter(cache: BaseCache, key: str, delta: int = 1):
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+_local_versions = local()
+
+
+class LocalVersion:
+    """
+    Version of a shared cache key kept by each thread, so it's read at most
+    once per request, and once per VERSIONS_CHECK_INTERVAL seconds outside
+    requests. Bumps made by the process itself are seen right away
+    """
+
+    def __init__(self, get_cache: Callable[[], BaseCache], key: str):
+        self.get_cache = get_cache
+        self.key = key
+
+    def get(self) -> str:
+        versions = get_local_versions()
+        version, checked_at = versions.get(self.key, (None, 0.0))
+        now = time.monotonic()
+        if version is None or now - checked_at >= settings.VERSIONS_CHECK_INTERVAL:
+            [version] = get_versions(self.get_cache(), [self.key])
+            versions[self.key] = (version, now)
+        return version
+
+    def set(self, version: str):
+        """
+        Keeps a version just read from the cache along with other keys
+        """
+        get_local_versions()[self.key] = (version, time.monotonic())
+
+    def bump(self):
+        bump_version(self.get_cache(), self.key)
+        get_local_versions().pop(self.key, None)
+
+
+def get_local_versions() -> Dict[str, Tuple[str, float]]:
+    if not hasattr(_local_versions, "versions"):
+        _local_versions.versions = {}
+    return _local_versions.versions
+
+
+def forget_local_versions(**kwargs):
+    """
+    Connected to request_started, so every request reads the versions again
+    """
+    _local_versions.versions = {}
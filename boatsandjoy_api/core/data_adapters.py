@@ -1,5 +1,4 @@
 from abc import ABC, abstractmethod
-from copy import deepcopy
 
 from .utils import filter_none_values_in_dict
 
@@ -14,7 +13,7 @@ class DataAdapterInterface(ABC):
 class DjangoDataAdapter(DataAdapterInterface):
     @classmethod
     def transform(cls, **kwargs) -> dict:
-        django_data = filter_none_values_in_dict(deepcopy(kwargs))
+        django_data = filter_none_values_in_dict(kwargs)
         if "obj_id" in django_data:
             django_data["id"] = django_data.pop("obj_id")
         return django_data
@@ -0,0 +1,124 @@
+from datetime import date
+from timeit import Timer
+from typing import Optional
+
+from django import forms
+from django.core.management.base import BaseCommand, CommandError
+
+from boatsandjoy_api.availability.constants import AvailabilityResponseFormats
+from boatsandjoy_api.availability.requests import GetDayAvailabilityRequest
+from boatsandjoy_api.availability.validators import GetAvailabilityRequestValidator
+from boatsandjoy_api.bookings.requests import CreateBookingRequest
+from boatsandjoy_api.bookings.validators import BookingCreationRequestValidator
+from boatsandjoy_api.core.exceptions import InvalidDataError
+from boatsandjoy_api.core.utils import MultipleIntField
+from boatsandjoy_api.core.validators import DjangoRequestValidator
+
+
+class DjangoGetAvailabilityForm(forms.Form):
+    """
+    Former day availability form, kept as reference
+    """
+
+    date = forms.DateField(required=True)
+    apply_resident_discount = forms.BooleanField(required=False)
+    response_format = forms.ChoiceField(
+        required=True, choices=AvailabilityResponseFormats.LIST
+    )
+
+
+class DjangoBookingCreationForm(forms.Form):
+    """
+    Former booking creation form, kept as reference
+    """
+
+    slot_ids = MultipleIntField(required=True)
+    customer_name = forms.CharField(required=True)
+    customer_telephone_number = forms.CharField(required=True)
+    extras = forms.CharField(required=False)
+
+
+class FormGetAvailabilityRequestValidator(DjangoRequestValidator):
+    FORM = DjangoGetAvailabilityForm
+
+
+class FormBookingCreationRequestValidator(DjangoRequestValidator):
+    FORM = DjangoBookingCreationForm
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares form based and compiled request validators on the day "
+        "availability and booking creation requests"
+    )
+
+    CASES = (
+        (
+            "day availability",
+            FormGetAvailabilityRequestValidator,
+            GetAvailabilityRequestValidator,
+            GetDayAvailabilityRequest(
+                date=date(2023, 7, 1), apply_resident_discount=True
+            ),
+            GetDayAvailabilityRequest(
+                date="2023-07-32",
+                apply_resident_discount=False,
+                response_format="full",
+            ),
+        ),
+        (
+            "booking creation",
+            FormBookingCreationRequestValidator,
+            BookingCreationRequestValidator,
+            CreateBookingRequest(
+                slot_ids=[1, 2, 3],
+                customer_name="Customer",
+                customer_telephone_number="600000000",
+                extras="",
+                is_resident=False,
+            ),
+            CreateBookingRequest(
+                slot_ids=["1", "x"],
+                customer_name=" ",
+                customer_telephone_number=None,
+                extras="\x00",
+                is_resident=False,
+            ),
+        ),
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'request':>16} {'valid':>6} {'forms (us)':>11} "
+            f"{'compiled (us)':>14} {'speedup':>8}"
+        )
+        for name, form_validator, validator, *requests in self.CASES:
+            for request in requests:
+                form_error = self._validate(form_validator, request)
+                error = self._validate(validator, request)
+                if error != form_error:
+                    raise CommandError(
+                        f"Validators differ for {request}: {error} != {form_error}"
+                    )
+                forms_time = self._time(form_validator, request, options)
+                compiled_time = self._time(validator, request, options)
+                self.stdout.write(
+                    f"{name:>16} {form_error is None!s:>6} "
+                    f"{forms_time * 1e6:>11.1f} {compiled_time * 1e6:>14.1f} "
+                    f"{forms_time / compiled_time:>7.1f}x"
+                )
+
+    @staticmethod
+    def _validate(validator, request) -> Optional[str]:
+        try:
+            validator.validate(request)
+        except InvalidDataError as e:
+            return str(e)
+
+    def _time(self, validator, request, options: dict) -> float:
+        timer = Timer(lambda: self._validate(validator, request))
+        number, _ = timer.autorange()
+        return min(timer.repeat(repeat=options["repeat"], number=number)) / number
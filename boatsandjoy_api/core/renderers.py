@@ -0,0 +1,33 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer with the same output but encoded by orjson, which already
+    writes dates and times as isoformat with UTC as Z. Decimals and other
+    types it doesn't know are handed to the DRF encoder. Indented or ascii
+    output, and anything orjson can't encode, fall back to JSONRenderer
+    """
+
+    OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+    ENCODER = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.ENCODER.default, option=self.OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same escaping than JSONRenderer to output a strict javascript subset
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
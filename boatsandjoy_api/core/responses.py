@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from datetime import date
+from dataclasses import fields, is_dataclass
+from operator import attrgetter
+from typing import Callable, Dict
 
 
 class ResponseBuilderInterface(ABC):
@@ -17,50 +19,39 @@ class ErrorResponseBuilder(ResponseBuilderInterface):
 
 
 class ResponseBuilder(ResponseBuilderInterface):
+    SERIALIZERS: Dict[type, Callable[[object], dict]] = {}
+
     def build(self) -> dict:
         if isinstance(self.data, dict):
-            data = self._serialize_dict(self.data)
+            data = self.data
         elif isinstance(self.data, list):
             data = [
-                self._serialize_object(obj)
-                if type(obj) != dict
-                else self._serialize_dict(obj)
+                self._serialize_object(obj) if type(obj) != dict else obj
                 for obj in self.data
             ]
         else:
             data = self._serialize_object(self.data)
         return {"error": False, "data": data}
 
-    def _serialize_dict(self, dict_obj: dict) -> dict:
-        return self._cast_dict_attrs(dict_obj)
-
-    @staticmethod
-    def _cast_dict_attrs(dict_obj: dict) -> dict:
-        for key in dict_obj:
-            if isinstance(dict_obj[key], date):
-                dict_obj[key] = dict_obj[key]
-        return dict_obj
-
-    def _serialize_object(self, obj: object) -> dict:
-        attrs = self._get_vars(obj)
-        obj = self._cast_obj_attrs(obj, attrs)
-        return {attr: getattr(obj, attr) for attr in attrs}
-
-    @staticmethod
-    def _get_vars(data) -> list:
-        if not data:
-            return []
-        if isinstance(data, list):
-            element = data[0]
-        else:
-            element = data
-        if type(element) == dict:
-            return list(element.keys())
-        return list(vars(element).keys())
+    @classmethod
+    def _serialize_object(cls, obj: object) -> dict:
+        if not obj:
+            return {}
+        serializer = cls.SERIALIZERS.get(type(obj))
+        if serializer is None:
+            serializer = cls.SERIALIZERS[type(obj)] = cls._compile_serializer(type(obj))
+        return serializer(obj)
 
     @staticmethod
-    def _cast_obj_attrs(obj, attrs):
-        for attr in attrs:
-            if isinstance(getattr(obj, attr), date):
-                setattr(obj, attr, getattr(obj, attr))
-        return obj
+    def _compile_serializer(type_: type) -> Callable[[object], dict]:
+        """
+        Dataclasses are read with a single attrgetter of their fields, built
+        once per class. Other objects are read through vars
+        """
+        if not is_dataclass(type_):
+            return lambda obj: dict(vars(obj))
+        attrs = tuple(field.name for field in fields(type_))
+        if len(attrs) < 2:
+            return lambda obj: {attr: getattr(obj, attr) for attr in attrs}
+        get_values = attrgetter(*attrs)
+        return lambda obj: dict(zip(attrs, get_values(obj)))
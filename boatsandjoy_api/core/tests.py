@@ -0,0 +1,246 @@
+import re
+from datetime import date
+from decimal import Decimal
+from unittest import skipUnless
+
+from django import forms
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from boatsandjoy_api.availability.models import Day, DayDefinition, PriceVariation
+from boatsandjoy_api.availability.repository import DjangoAvailabilityRepository
+from boatsandjoy_api.availability.requests import (
+    GetDayAvailabilityRequest,
+    GetMonthAvailabilityRequest,
+)
+from boatsandjoy_api.availability.validators import (
+    GetAvailabilityRequestValidator,
+    GetMonthAvailabilityRequestValidator,
+)
+from boatsandjoy_api.boats.models import Boat
+from boatsandjoy_api.bookings.api import BookingsApi
+from boatsandjoy_api.bookings.models import Promocode
+from boatsandjoy_api.bookings.repository import DjangoBookingsRepository
+from boatsandjoy_api.bookings.requests import CreateBookingRequest
+from boatsandjoy_api.bookings.validators import BookingCreationRequestValidator
+from .exceptions import InvalidDataError
+from .management.commands.benchmark_validators import (
+    FormBookingCreationRequestValidator,
+    FormGetAvailabilityRequestValidator,
+)
+from .validators import DjangoRequestValidator
+
+
+class DjangoGetMonthAvailabilityForm(forms.Form):
+    month = forms.IntegerField(required=True)
+    year = forms.IntegerField(required=True)
+
+
+class FormGetMonthAvailabilityRequestValidator(DjangoRequestValidator):
+    FORM = DjangoGetMonthAvailabilityForm
+
+
+class CompiledRequestValidatorTestCase(SimpleTestCase):
+    """
+    Compiled validators must accept and reject the same requests than the
+    forms they replace, with the same messages
+    """
+
+    def test_day_availability_requests(self):
+        self._assert_same_errors(
+            FormGetAvailabilityRequestValidator,
+            GetAvailabilityRequestValidator,
+            [
+                GetDayAvailabilityRequest(
+                    date=date(2023, 7, 1), apply_resident_discount=True
+                ),
+                GetDayAvailabilityRequest(
+                    date="2023-07-01",
+                    apply_resident_discount="false",
+                    response_format="compact",
+                ),
+                GetDayAvailabilityRequest(
+                    date=None, apply_resident_discount=None, response_format=None
+                ),
+                GetDayAvailabilityRequest(
+                    date="2023-07-32",
+                    apply_resident_discount=False,
+                    response_format="full",
+                ),
+                GetDayAvailabilityRequest(
+                    date="07/01/2023", apply_resident_discount="on"
+                ),
+            ],
+        )
+
+    def test_month_availability_requests(self):
+        self._assert_same_errors(
+            FormGetMonthAvailabilityRequestValidator,
+            GetMonthAvailabilityRequestValidator,
+            [
+                GetMonthAvailabilityRequest(month=7, year=2023),
+                GetMonthAvailabilityRequest(month="7", year=" 2023 "),
+                GetMonthAvailabilityRequest(month=None, year=""),
+                GetMonthAvailabilityRequest(month="july", year=2023.5),
+                GetMonthAvailabilityRequest(month=True, year=2023.0),
+            ],
+        )
+
+    def test_booking_creation_requests(self):
+        self._assert_same_errors(
+            FormBookingCreationRequestValidator,
+            BookingCreationRequestValidator,
+            [
+                CreateBookingRequest(
+                    slot_ids=[1, 2, 3],
+                    customer_name="Customer",
+                    customer_telephone_number="600000000",
+                    extras="",
+                    is_resident=False,
+                ),
+                CreateBookingRequest(
+                    slot_ids=["1", "2"],
+                    customer_name=" Customer ",
+                    customer_telephone_number=600000000,
+                    extras=None,
+                    is_resident=True,
+                ),
+                CreateBookingRequest(
+                    slot_ids=[],
+                    customer_name="",
+                    customer_telephone_number=None,
+                    extras="",
+                    is_resident=False,
+                ),
+                CreateBookingRequest(
+                    slot_ids=["1", "x"],
+                    customer_name=" ",
+                    customer_telephone_number="600\x00000",
+                    extras="\x00",
+                    is_resident=False,
+                ),
+                CreateBookingRequest(
+                    slot_ids="1",
+                    customer_name=["Customer"],
+                    customer_telephone_number="600000000",
+                    extras=1,
+                    is_resident=False,
+                ),
+            ],
+        )
+
+    def _assert_same_errors(self, form_validator, validator, requests: list):
+        for request in requests:
+            with self.subTest(request=request):
+                self.assertEqual(
+                    self._validate(validator, request),
+                    self._validate(form_validator, request),
+                )
+
+    @staticmethod
+    def _validate(validator, request) -> str:
+        try:
+            validator.validate(request)
+        except InvalidDataError as e:
+            return str(e)
+        return ""
+
+
+@skipUnless(
+    connection.vendor == "postgresql", "Query plans can only be checked on PostgreSQL"
+)
+class QueryPlansTestCase(TestCase):
+    """
+    Hot repository lookups must not scan Day, Slot or Booking tables
+    sequentially
+    """
+
+    CHECKED_TABLES = {"availability_day", "availability_slot", "bookings_booking"}
+
+    @classmethod
+    def setUpTestData(cls):
+        boat = Boat.objects.create(name="Boat")
+        day_definition = DayDefinition.objects.create(
+            boat=boat,
+            n_slots=8,
+            hours_per_slot=1,
+            price_per_hour=Decimal(40),
+            from_date=date(2022, 1, 1),
+            to_date=date(2022, 12, 31),
+        )
+        PriceVariation.objects.create(
+            boat=boat, from_date=date(2022, 7, 1), to_date=date(2022, 8, 31), factor=1.3
+        )
+        DjangoAvailabilityRepository.create_availability(
+            [
+                DjangoAvailabilityRepository.get_day_definition_domain_object(
+                    day_definition
+                )
+            ],
+            from_=date(2022, 1, 1),
+            to=date(2022, 12, 31),
+        )
+        cls.day = Day.objects.get(boat=boat, date=date(2022, 7, 15))
+        cls.slot_ids = list(
+            cls.day.slots.filter(position__lt=2).values_list("id", flat=True)
+        )
+        cls.booking = DjangoBookingsRepository.create(
+            price=Decimal(80),
+            slot_ids=cls.slot_ids,
+            customer_name="Customer",
+            customer_telephone_number="600000000",
+            customer_email="customer@boatsandjoy.com",
+            session_id="session",
+            extras="",
+            promocode="",
+        )
+        Promocode.objects.create(
+            name="promocode",
+            use_from=date(2022, 1, 1),
+            use_to=date.today(),
+            booking_from=date(2022, 1, 1),
+            booking_to=date(2022, 12, 31),
+            factor=0.1,
+        )
+
+    def test_repository_lookups_do_not_scan_tables_sequentially(self):
+        with CaptureQueriesContext(connection) as context:
+            self._run_repository_lookups()
+        sqls = dict.fromkeys(
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].lstrip().upper().startswith("SELECT")
+        )
+        self.assertTrue(sqls)
+
+        seq_scans = []
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Otherwise tiny tables are always scanned, with or without indexes
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            for sql in sqls:
+                cursor.execute(f"EXPLAIN {sql}")
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+                tables = self.CHECKED_TABLES.intersection(
+                    re.findall(r"Seq Scan on (\w+)", plan)
+                )
+                if tables:
+                    seq_scans.append((sorted(tables), sql))
+        self.assertEqual(seq_scans, [])
+
+    def _run_repository_lookups(self):
+        boat_id = self.day.boat_id
+        date_ = self.day.date
+        DjangoAvailabilityRepository.filter_boats_days([boat_id], date_)
+        DjangoAvailabilityRepository.filter_days_occupancy(
+            [boat_id], date_.replace(day=1), date_
+        )
+        DjangoAvailabilityRepository.refresh_days_occupancy([self.day.id], dry_run=True)
+        DjangoAvailabilityRepository.filter_days_definitions(boat_id=boat_id)
+        DjangoAvailabilityRepository.filter_price_variations(boat_id=boat_id)
+        DjangoBookingsRepository.get(session_id=self.booking.session_id)
+        DjangoBookingsRepository.get_purchase_details(
+            price=Decimal(0), slot_ids=self.slot_ids
+        )
+        DjangoBookingsRepository.get_boat_day(self.slot_ids)
+        BookingsApi._apply_promocode(Decimal(0), "promocode", date_)
@@ -3,6 +3,7 @@ from datetime import date, datetime
 from django import forms
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
+from django.db import connection
 from django.template.loader import render_to_string
 
 
@@ -29,3 +30,15 @@ def send_email(subject: str, to_email: str, template: str, **kwargs):
     )
     msg.attach_alternative(render_to_string(template, kwargs), "text/html")
     msg.send()
+
+
+def try_advisory_xact_lock(key1: int, key2: int) -> bool:
+    """
+    Lock held until the current transaction ends and shared by every node
+    using the database. Databases without advisory locks always get it
+    """
+    if connection.vendor != "postgresql":
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_xact_lock(%s, %s)", [key1, key2])
+        return cursor.fetchone()[0]
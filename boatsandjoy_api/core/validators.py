@@ -1,7 +1,24 @@
 from abc import ABC, abstractmethod
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, fields
+from datetime import date
+from decimal import Decimal
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Tuple,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+from django import forms
+from django.core.exceptions import NON_FIELD_ERRORS
 
 from .exceptions import InvalidDataError
+from .utils import MultipleIntField
 
 
 class RequestValidatorInterface(ABC):
@@ -23,3 +40,132 @@ class DjangoRequestValidator(RequestValidatorInterface):
         form = cls.FORM(data=asdict(request))
         if not form.is_valid():
             raise InvalidDataError(f"Validation error {form.errors.as_text()}")
+
+
+class CompiledRequestValidator(RequestValidatorInterface):
+    """
+    Validates the REQUIRED and OPTIONAL attributes of a request with the
+    same results and messages than a form with the field Django would use
+    for their type hints. Checks are built once per validator: values of the
+    expected type are accepted right away and any other value is cleaned by
+    that form field
+    """
+
+    REQUEST: type = None
+    REQUIRED: Tuple[str, ...] = ()
+    OPTIONAL: Tuple[str, ...] = ()
+    CHOICES: Dict[str, tuple] = {}
+
+    @classmethod
+    def validate(cls, request: dataclass):
+        checks = cls.__dict__.get("_checks")
+        if checks is None:
+            checks = cls._checks = cls._compile_checks()
+
+        errors = {}
+        cleaned_data = {}
+        for attr, check in checks:
+            try:
+                cleaned_data[attr] = check(getattr(request, attr))
+            except forms.ValidationError as e:
+                errors[attr] = e.messages
+        try:
+            cls.clean(cleaned_data)
+        except forms.ValidationError as e:
+            errors[NON_FIELD_ERRORS] = e.messages
+
+        if errors:
+            raise InvalidDataError(f"Validation error {cls._as_text(errors)}")
+
+    @classmethod
+    def clean(cls, cleaned_data: Dict[str, Any]):
+        """
+        Checks between attributes, cleaned_data only has the valid ones
+        """
+        pass
+
+    @classmethod
+    def _compile_checks(cls) -> List[Tuple[str, Callable[[Any], Any]]]:
+        type_hints = get_type_hints(cls.REQUEST)
+        return [
+            (field.name, cls._compile_check(field.name, type_hints[field.name]))
+            for field in fields(cls.REQUEST)
+            if field.name in cls.REQUIRED or field.name in cls.OPTIONAL
+        ]
+
+    @classmethod
+    def _compile_check(cls, attr: str, type_: type) -> Callable[[Any], Any]:
+        required = attr in cls.REQUIRED
+        if get_origin(type_) is Union:
+            [type_] = [arg for arg in get_args(type_) if arg is not type(None)]
+
+        if get_origin(type_) is list and get_args(type_) == (int,):
+            form_field = MultipleIntField(required=required)
+
+            def is_valid(value: Any) -> bool:
+                return (
+                    type(value) in (list, tuple)
+                    and len(value) > 0
+                    and all(type(item) is int for item in value)
+                )
+
+        elif type_ is str and attr in cls.CHOICES:
+            form_field = forms.ChoiceField(required=required, choices=cls.CHOICES[attr])
+            choices = frozenset(str(choice) for choice, _ in cls.CHOICES[attr])
+
+            def is_valid(value: Any) -> bool:
+                return type(value) is str and value in choices
+
+        elif type_ is str:
+            form_field = forms.CharField(required=required)
+
+            def is_valid(value: Any) -> bool:
+                return (
+                    type(value) is str
+                    and "\x00" not in value
+                    and (not required or bool(value.strip()))
+                )
+
+        elif type_ is bool:
+            form_field = forms.BooleanField(required=required)
+
+            def is_valid(value: Any) -> bool:
+                return type(value) is bool and (value or not required)
+
+        elif type_ is int:
+            form_field = forms.IntegerField(required=required)
+
+            def is_valid(value: Any) -> bool:
+                return type(value) is int
+
+        elif type_ is Decimal:
+            form_field = forms.DecimalField(required=required)
+
+            def is_valid(value: Any) -> bool:
+                return type(value) is Decimal and value.is_finite()
+
+        elif type_ is date:
+            form_field = forms.DateField(required=required)
+
+            def is_valid(value: Any) -> bool:
+                return type(value) is date
+
+        else:
+            raise TypeError(f"{cls.__name__} can't validate {attr} of type {type_}")
+
+        def check(value: Any) -> Any:
+            if is_valid(value) or (value is None and not required):
+                return value
+            return form_field.clean(value)
+
+        return check
+
+    @staticmethod
+    def _as_text(errors: Dict[str, List[str]]) -> str:
+        """
+        Same text than Django form errors
+        """
+        return "\n".join(
+            f"* {attr}\n" + "\n".join(f"  * {message}" for message in messages)
+            for attr, messages in errors.items()
+        )
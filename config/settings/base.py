@@ -71,6 +71,11 @@ DATABASES = {
 }
 DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
 
+# CACHE CONFIGURATION
+# https://docs.djangoproject.com/en/dev/ref/settings/#caches
+# ------------------------------------------------------------------------------
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
 # ADMIN CONFIGURATION
 # ------------------------------------------------------------------------------
 ADMIN_URL = "admin/"
@@ -195,6 +200,16 @@ STATICFILES_FINDERS = (
 # THIRD PARTY APPLICATIONS
 # ******************************************************************************
 
+# Django REST framework
+# https://www.django-rest-framework.org/api-guide/renderers/
+# ------------------------------------------------------------------------------
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "boatsandjoy_api.core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
 # Cors
 # https://github.com/adamchainz/django-cors-headers
 # ------------------------------------------------------------------------------
@@ -220,3 +235,26 @@ EMAIL_USE_TLS = True
 # OTHERS
 # ******************************************************************************
 RESIDENT_DISCOUNT = 0.25
+
+# Cache (from CACHES) where availability responses are stored and for how long
+AVAILABILITY_CACHE = env("AVAILABILITY_CACHE", default="default")
+AVAILABILITY_CACHE_TIMEOUT = env.int("AVAILABILITY_CACHE_TIMEOUT", default=60 * 60 * 24)
+# Seconds each process keeps month cache hits and misses before adding them to
+# the shared counters
+AVAILABILITY_CACHE_STATS_FLUSH_INTERVAL = env.int(
+    "AVAILABILITY_CACHE_STATS_FLUSH_INTERVAL", default=60
+)
+
+# Seconds between saves of a running availability job, and without them after
+# which the job is considered stalled and run again
+AVAILABILITY_JOB_HEARTBEAT_INTERVAL = env.int(
+    "AVAILABILITY_JOB_HEARTBEAT_INTERVAL", default=60
+)
+AVAILABILITY_JOB_TIMEOUT = env.int("AVAILABILITY_JOB_TIMEOUT", default=60 * 10)
+
+# Cache (from CACHES) shared by every process to tell when active boats change
+BOATS_CACHE = env("BOATS_CACHE", default="default")
+
+# Seconds the versions of active boats, day definitions and price variations
+# kept in memory are trusted outside requests, which always read them again
+VERSIONS_CHECK_INTERVAL = env.int("VERSIONS_CHECK_INTERVAL", default=5)
@@ -22,6 +22,15 @@ DEBUG = False
 # ------------------------------------------------------------------------------
 ALLOWED_HOSTS = ("boatsandjoy-api.herokuapp.com",)
 
+# CACHE CONFIGURATION
+# https://docs.djangoproject.com/en/dev/ref/settings/#caches
+# Shared between all the gunicorn workers, local memory caches are not
+# ------------------------------------------------------------------------------
+CACHES = {"default": env.cache("CACHE_URL", default="dbcache://boatsandjoy_cache")}
+# The database cache culls a third of its entries once it holds 300 of them,
+# while availability keeps responses and versions for every date of a season
+CACHES["default"].setdefault("OPTIONS", {}).setdefault("MAX_ENTRIES", 100000)
+
 # TEMPLATE CONFIGURATION
 # https://docs.djangoproject.com/en/dev/ref/templates/api/#django.template.loaders.cached.Loader
 # ------------------------------------------------------------------------------